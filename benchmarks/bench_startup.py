@@ -0,0 +1,63 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# 冷启动导入耗时基准
+# 每次在新的解释器中以 -X importtime 导入模块, 取各次的中位数;
+# 核心模块的预算按扣除 numpy 之后的增量计算 (numpy 是核心唯一的依赖)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_MODULES = ("src.calculator", "src.stream", "src.batch")
+GUI_MODULES = ("tkinter", "matplotlib")
+
+
+# 在新进程中导入 module, 返回 {模块名: 累计导入微秒}
+def import_times(module):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line: continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue
+    return times
+
+
+# 导入核心模块后检查是否带入了界面依赖
+def loaded_gui_modules():
+    code = ("import sys; import " + ", ".join(CORE_MODULES) +
+            "; print(','.join(m for m in %r if m in sys.modules))" % (GUI_MODULES,))
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return [m for m in proc.stdout.strip().split(",") if m]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold import time of the GUI-free core")
+    parser.add_argument("-n", "--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    args = parser.parse_args(argv)
+
+    ok = True
+    gui = loaded_gui_modules()
+    print(f"GUI modules pulled in by core: {', '.join(gui) if gui else 'none'}")
+    ok &= not gui
+
+    for module in CORE_MODULES:
+        runs = [import_times(module) for _ in range(args.runs)]
+        total = statistics.median(r[module] for r in runs) / 1000
+        numpy = statistics.median(r.get("numpy", 0) for r in runs) / 1000
+        own = total - numpy
+        status = "OK" if own < args.budget_ms else "OVER BUDGET"
+        print(f"{module:16s} total {total:7.1f} ms  numpy {numpy:7.1f} ms  own {own:6.1f} ms  [{status}]")
+        ok &= own < args.budget_ms
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
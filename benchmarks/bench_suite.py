@@ -0,0 +1,220 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# 性能基准套件 (无界面, Agg 后端)
+# 覆盖: 差分表构建与六种方法计算, 批量求值, 弗雷瑟图绘制与路径高亮, 曲线图, 以及完整的 CRAFT (process_data);
+# 结果写为 JSON, 指定 --baseline 时与上一版本的结果逐项比较, 变慢超过阈值即返回 1
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import matplotlib
+matplotlib.use("Agg")
+# 缺少界面字体时的替换警告与计时无关
+logging.getLogger("matplotlib.font_manager").setLevel(logging.ERROR)
+
+from src.calculator import InterpolationCalculator, METHODS, ENGINES
+
+SIZES = (5, 50, 500, 5000)
+POINTS = (10**2, 10**3, 10**4, 10**5, 10**6)
+DIAGRAM_SIZES = (6, 30, 100, 300, 1000)
+QUICK_SIZES = (5, 50, 500)
+QUICK_POINTS = (10**2, 10**3, 10**4)
+QUICK_DIAGRAM_SIZES = (6, 30, 100)
+
+
+# 计时: 自动确定每轮调用次数使单轮不短于 min_time, 返回每次调用耗时 (秒) 的各轮结果
+def measure(fn, repeat=5, min_time=0.05):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number): fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20: break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+    runs = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number): fn()
+        runs.append((time.perf_counter() - start) / number)
+    return runs
+
+
+# 等距样本数据: X = 0.1 i, Y = sin(X), 目标点在中间节点右侧 0.3h 处;
+# n 较大时高阶差分的舍入误差按 2^j 放大并溢出, 与计时无关, 不报警告
+np.seterr(all="ignore")
+
+
+def sample_data(n):
+    X = np.arange(n) * 0.1
+    return X, np.sin(X), X[n // 2] + 0.03
+
+
+def loaded(n):
+    calc = InterpolationCalculator()
+    calc.load_arrays(*sample_data(n))
+    return calc
+
+
+# 计算器: 差分表构建, calculate_all (清空编译缓存), 全局多项式的两种求值方式, 六种方法批量求值, 多目标 calculate_all_many
+def bench_calculator(sizes, points):
+    for n in sizes:
+        calc = loaded(n)
+        yield "build_diff_table", {"n": n}, lambda: calc._build_diff_table()
+
+        def calculate_all(calc=calc):
+            calc._compiled, calc._results = {}, {}
+            calc.calculate_all()
+        yield "calculate_all", {"n": n}, calculate_all
+
+        xs = np.linspace(calc.X[0], calc.X[-1], 10**4)
+        for engine in ENGINES:
+            yield "evaluate_global", {"engine": engine, "n": n, "points": 10**4}, lambda calc=calc, xs=xs, engine=engine: calc.evaluate(None, xs, engine)
+
+    calc = loaded(10)
+    for m in points:
+        xs = np.linspace(calc.X[0], calc.X[-1], m)
+        for method in METHODS:
+            yield "evaluate", {"method": method, "points": m}, lambda method=method, xs=xs: calc.evaluate(method, xs)
+
+    # 多目标: 同一张差分表上按基点分组一次求出全部方法
+    calc = loaded(50)
+    for m in points:
+        if m > 10**5: continue
+        ts = np.linspace(calc.X[0], calc.X[-1], m)
+        yield "calculate_all_many", {"n": 50, "targets": m}, lambda ts=ts: calc.calculate_all_many(ts)
+
+
+# 弗雷瑟图: 完整绘制 (含渲染) 与六种方法依次高亮
+def bench_plotter(sizes):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from src.plotter import FraserPlotter
+
+    for n in sizes:
+        fig = Figure(figsize=(6, 6), dpi=100)
+        plotter = FraserPlotter(fig.add_subplot(), FigureCanvasAgg(fig))
+        calc = loaded(n)
+        yield "plot_diagram", {"n": n}, lambda: plotter.plot_diagram(calc)
+
+        def highlight(plotter=plotter, calc=calc):
+            for method in METHODS: plotter.highlight_path(method, calc)
+        plotter.plot_diagram(calc)
+        yield "highlight_path_x6", {"n": n}, highlight
+
+
+# 曲线图: 冷启动 (清空曲线缓存) 与在六种方法间切换 (命中缓存)
+def bench_curves():
+    from src.curve_plotter import CurvePlotter
+
+    curves = CurvePlotter(None)
+    calc = loaded(10)
+
+    def cold():
+        curves.curve_cache.clear()
+        curves._true_key = None
+        curves.plot(calc, "np.sin(x)")
+
+    def switch():
+        for method in METHODS: curves.plot(calc, "np.sin(x)", method)
+    yield "curve_plot_cold", {"n": 10}, cold
+    yield "curve_plot_switch_x6", {"n": 10}, switch
+
+
+# 完整 CRAFT 流程; 需要 Tk 窗口, 无显示环境时跳过
+def bench_app():
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"process_data skipped: {e}", file=sys.stderr)
+        return
+    from src.app import InterpolationApp
+
+    app = InterpolationApp(root)
+
+    # 计算在后台线程中进行: 等待线程结束, 再由 _poll 在主线程处理 "done" 消息并刷新界面
+    def craft():
+        app.process_data()
+        app._worker.join()
+        app._poll()
+        root.update()
+    yield "process_data", {"n": len(app.calculator.X)}, craft
+
+
+def run(args):
+    sizes, points, diagram = (QUICK_SIZES, QUICK_POINTS, QUICK_DIAGRAM_SIZES) if args.quick else (SIZES, POINTS, DIAGRAM_SIZES)
+    groups = [bench_calculator(sizes, points), bench_plotter(diagram), bench_curves()]
+    if not args.no_app: groups.append(bench_app())
+
+    results = []
+    for group in groups:
+        for name, params, fn in group:
+            if args.filter and args.filter not in name: continue
+            runs = measure(fn, args.repeat)
+            median = statistics.median(runs)
+            results.append({"name": name, "params": params, "median_s": median, "min_s": min(runs), "runs": len(runs)})
+            desc = " ".join(f"{k}={v}" for k, v in params.items())
+            print(f"{name:22s} {desc:32s} {median * 1e3:10.3f} ms", file=sys.stderr)
+    return results
+
+
+# 与基准结果比较, 返回变慢超过阈值的条目
+def compare(results, baseline, threshold):
+    old = {(r["name"], json.dumps(r["params"], sort_keys=True)): r["min_s"] for r in baseline["results"]}
+    slower = []
+    for r in results:
+        key = (r["name"], json.dumps(r["params"], sort_keys=True))
+        if key in old and old[key] > 0 and r["min_s"] / old[key] > threshold:
+            slower.append((r, r["min_s"] / old[key]))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmark suite (Agg backend)")
+    parser.add_argument("-o", "--output", default="-", help="result JSON file, default stdout")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-k", "--filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes for a fast smoke run")
+    parser.add_argument("--no-app", action="store_true", help="skip the Tk process_data benchmark")
+    parser.add_argument("--baseline", default=None, help="previous result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown ratio against the baseline")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": run(args),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            slower = compare(report["results"], json.load(f), args.threshold)
+        for r, ratio in slower:
+            print(f"REGRESSION {r['name']} {r['params']}: {ratio:.2f}x slower", file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
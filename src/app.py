@@ -1,16 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os
+import queue
 import sys
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 from .theme import Theme
 from .plotter import FraserPlotter
 from .curve_plotter import CurvePlotter
 from .logger import LogHandler
-from .calculator import InterpolationCalculator
+from .calculator import InterpolationCalculator, METHODS
+from .true_func import compile_true_func
+from .cache import cache
+from .perf import perf
 
 # 主应用类
 class InterpolationApp:
@@ -40,14 +43,32 @@ class InterpolationApp:
 
         Theme.apply_styles()
         
-        self.calculator = InterpolationCalculator()
+        self.calculator = InterpolationCalculator(cache=cache)
         self.plotter = None
         self.logger = None
+        self.profile_next = False
+        perf.enabled = True
+        # 后台计算: 代次编号, 取消标志, 结果队列与轮询间隔
+        self._generation = 0
+        self._cancel = None
+        self._worker = None
+        self._queue = queue.Queue()
+        self._polling = False
+        self.poll_ms = 30
+        # 实时模式: 防抖间隔, 待执行的定时任务, 当前结果对应的输入与结果
+        self.debounce_ms = 400
+        self._live_job = None
+        self._applied = None
+        self._results = None
+        self._errors = None
         
         self.setup_ui()
 
     # 设置用户界面
     def setup_ui(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
         main_container = ttk.Frame(self.root, padding=20)
         main_container.pack(fill="both", expand=True, padx=10, pady=10)
 
@@ -84,8 +105,31 @@ class InterpolationApp:
         self.entry_base = ttk.Entry(input_frame)
         self.entry_base.grid(row=4, column=1, sticky="ew", padx=15, pady=5)
 
+        # 截断: 差分表的阶数上限与逐阶求和的提前终止容差, 留空表示不限制
+        ttk.Label(input_frame, text="MAX ORDER:").grid(row=5, column=0, sticky="w", pady=5)
+        limits = ttk.Frame(input_frame)
+        limits.grid(row=5, column=1, sticky="ew", padx=15, pady=5)
+        limits.columnconfigure(0, weight=1)
+        limits.columnconfigure(2, weight=1)
+        self.entry_order = ttk.Entry(limits)
+        self.entry_order.grid(row=0, column=0, sticky="ew")
+        ttk.Label(limits, text="TOL:").grid(row=0, column=1, sticky="w", padx=(15, 15))
+        self.entry_tol = ttk.Entry(limits)
+        self.entry_tol.grid(row=0, column=2, sticky="ew")
+
         self.btn_calc = ttk.Button(input_frame, text="CRAFT!", command=self.process_data, cursor="hand2")
-        self.btn_calc.grid(row=0, column=2, rowspan=5, sticky="nsew", padx=(10, 0), pady=5)
+        self.btn_calc.grid(row=0, column=2, rowspan=6, sticky="nsew", padx=(10, 0), pady=5)
+
+        # 实时模式: 输入停止变化 debounce_ms 毫秒后自动重算
+        self.live_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(input_frame, text="LIVE", variable=self.live_var, command=self.schedule_live).grid(row=6, column=2, sticky="w", padx=(10, 0), pady=(5, 0))
+        for entry in (self.entry_x, self.entry_y, self.entry_target, self.entry_func, self.entry_base, self.entry_order, self.entry_tol):
+            entry.bind("<KeyRelease>", self.schedule_live)
+
+        # 后台计算进度, 空闲时隐藏
+        self.progress = ttk.Progressbar(input_frame, mode="determinate", maximum=4)
+        self.progress.grid(row=6, column=0, columnspan=2, sticky="ew", pady=(5, 0))
+        self.progress.grid_remove()
 
         # 内容区域
         content_frame = ttk.Frame(main_container)
@@ -100,7 +144,8 @@ class InterpolationApp:
         plot_frame = ttk.LabelFrame(content_frame, text=" MAP ", padding=5)
         plot_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 10))
 
-        self.fig, self.ax = plt.subplots(figsize=(6, 6), dpi=100)
+        self.fig = Figure(figsize=(6, 6), dpi=100)
+        self.ax = self.fig.add_subplot()
         self.fig.patch.set_facecolor(Theme.COLORS["paper"])
         self.ax.set_facecolor(Theme.COLORS["paper"])
         self.canvas = FigureCanvasTkAgg(self.fig, master=plot_frame)
@@ -117,16 +162,22 @@ class InterpolationApp:
         summary_frame = ttk.LabelFrame(right_panel, text=" LEDGER ", padding=5)
         summary_frame.pack(fill="x", pady=(0, 15))
         
-        cols = ("method", "result")
+        cols = ("method", "result", "order", "error")
         self.tree = ttk.Treeview(summary_frame, columns=cols, show="headings", height=8)
         self.tree.heading("method", text="METHOD")
         self.tree.heading("result", text="VALUE")
-        self.tree.column("method", width=160, anchor="center") 
-        self.tree.column("result", width=160, anchor="center")
+        self.tree.heading("order", text="ORDER")
+        self.tree.heading("error", text="EST. ERR")
+        self.tree.column("method", width=100, anchor="center") 
+        self.tree.column("result", width=100, anchor="center")
+        self.tree.column("order", width=50, anchor="center")
+        self.tree.column("error", width=70, anchor="center")
         self.tree.pack(fill="x")
         
         self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
         self.tree.bind("<Button-1>", self.disable_resize)
+        self.root.bind("<F8>", self.export_perf)
+        self.root.bind("<F9>", self.arm_profile)
 
         # 分析区域
         analysis_frame = ttk.LabelFrame(right_panel, text=" ANALYSIS ", padding=5)
@@ -136,6 +187,9 @@ class InterpolationApp:
         self.curve_frame.pack(fill="both", expand=True)
         
         self.curve_plotter = CurvePlotter(self.curve_frame)
+        # 统计两块画布的完整重绘次数
+        for canvas in (self.canvas, self.curve_plotter.canvas):
+            canvas.mpl_connect("draw_event", lambda event: perf.count("redraws"))
 
         # 日志区域
         log_frame = ttk.LabelFrame(right_panel, text=" LOG ", padding=5)
@@ -176,74 +230,281 @@ class InterpolationApp:
         
         item = self.tree.item(selected_item)
         method_name = item['values'][0]
+        first = len(perf.spans)
         
-        if method_name in Theme.PATH_COLORS:
-            self.plotter.highlight_path(method_name, self.calculator)
-            
-            # 更新曲线图以显示所选方法
-            true_func = self.entry_func.get().strip()
-            self.curve_plotter.plot(self.calculator, true_func if true_func else None, method_name)
+        with perf.span(f"select {method_name}"):
+            if method_name in Theme.PATH_COLORS:
+                with perf.span("highlight"):
+                    self.plotter.highlight_path(method_name, self.calculator)
+                
+                # 更新曲线图以显示所选方法
+                true_func = self.entry_func.get().strip()
+                with perf.span("curve plot"):
+                    self.curve_plotter.plot(self.calculator, true_func if true_func else None, method_name)
+            else:
+                with perf.span("highlight"):
+                    self.plotter.clear_highlights()
+                # 重置曲线为默认状态
+                true_func = self.entry_func.get().strip()
+                with perf.span("curve plot"):
+                    self.curve_plotter.plot(self.calculator, true_func if true_func else None)
+            with perf.span("render"):
+                self.root.update_idletasks()
+
+        spans = perf.summary()[first:]
+        self.logger.plain(f"• {spans[0][0]}: " + ", ".join(f"{name} {ms:.1f} ms" for name, ms, _ in spans[1:]))
+
+    # F9: 下一次 CRAFT 在 cProfile 下运行
+    def arm_profile(self, event=None):
+        self.profile_next = True
+        self.logger.tag("cProfile armed for next CRAFT", "accent")
+
+    # F8: 导出最近一次 CRAFT (及其后的选择) 的计时记录
+    def export_perf(self, event=None):
+        try:
+            perf.export("fraser_perf.json", "fraser_trace.json")
+            self.logger.tag(f"Perf exported: {os.path.abspath('fraser_perf.json')}, fraser_trace.json", "info")
+        except OSError as e:
+            self.logger.tag(f"Perf export failed: {e}", "warn")
+
+    # 记录各方法相对真实函数的误差 (节点区间上的最大/均方根误差, 目标点误差); errors 为字符串时是表达式错误
+    def log_true_errors(self, true_func, errors):
+        if isinstance(errors, str):
+            self.logger.tag(f"True Func Error: {errors}", "warn")
+            return
+        self.logger.plain(f"• Error vs f(x) = {true_func}")
+        self.logger.plain(f"  {'METHOD':<9} {'MAX':>8} {'RMS':>8} {'@TARGET':>9}")
+        for m_name, e in errors.items():
+            self.logger.plain(f"  {m_name:<9} {e['max_abs']:8.1e} {e['rms']:8.1e} {e['target']:9.1e}")
+
+    # 读取当前输入 (X, Y, 目标点, 强制基点, 真实函数, 阶数上限, 容差)
+    def _read_inputs(self):
+        return (self.entry_x.get(), self.entry_y.get(), self.entry_target.get(),
+                self.entry_base.get(), self.entry_func.get().strip(), self.entry_order.get(), self.entry_tol.get())
+
+    # 当前账本中选中的方法, 未选中时为 None
+    def _selected_method(self):
+        selected_item = self.tree.selection()
+        if not selected_item: return None
+        method_name = self.tree.item(selected_item)['values'][0]
+        return method_name if method_name in Theme.PATH_COLORS else None
+
+    # 真实函数误差 (可在后台线程调用); 表达式错误时返回错误信息字符串
+    def _true_errors(self, calc, true_func):
+        if not true_func: return None
+        with perf.span("true func errors"):
+            try:
+                return compile_true_func(true_func).errors(calc, np.linspace(calc.X[0], calc.X[-1], 200))
+            except Exception as e:
+                return str(e)
+
+    # 实时模式: 每次输入都重新计时, 停止输入 debounce_ms 毫秒后才重算
+    def schedule_live(self, event=None):
+        if not self.live_var.get(): return
+        if self._live_job is not None: self.root.after_cancel(self._live_job)
+        self._live_job = self.root.after(self.debounce_ms, self.live_update)
+
+    # 实时重算: 只重做受影响的部分. X/Y/阶数上限变化 (或仍有计算在进行) 时完整重算;
+    # 只改目标点/强制基点/容差时保留差分表; 只改真实函数时只重画真实曲线
+    def live_update(self):
+        self._live_job = None
+        inputs = self._read_inputs()
+        applied = self._applied
+        if inputs == applied: return
+        if (applied is None or inputs[:2] != applied[:2] or inputs[5] != applied[5]
+                or (self._worker is not None and self._worker.is_alive())):
+            self.process_data(live=True)
+        elif inputs[2:4] != applied[2:4] or inputs[6] != applied[6]:
+            self._retarget(inputs)
         else:
-            self.plotter.clear_highlights()
-            # 重置曲线为默认状态
-            true_func = self.entry_func.get().strip()
-            self.curve_plotter.plot(self.calculator, true_func if true_func else None)
-
-    # 处理数据
-    def process_data(self):
-        self.logger.clear()
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+            self._refunc(inputs)
+
+    # 只改目标点 / 强制基点 / 容差: 差分表不变, 只重算 p, base_k 与各方法的值; 基点变化时只移动图中的基线
+    def _retarget(self, inputs):
+        _, _, target_str, base_str, true_func, _, tol_str = inputs
+        calc = self.calculator
+        old_k = calc.base_k
+        perf.reset()
+        try:
+            with perf.span("set target"):
+                if not target_str: raise ValueError("Target X is empty")
+                calc.set_tol(tol_str)
+                calc.set_target(float(target_str), base_str)
+        except ValueError as e:
+            self.logger.tag(f"Live: {e}", "warn")
+            return
+        with perf.span("calculate_all"):
+            results = calc.calculate_all()
+        errors = self._true_errors(calc, true_func)
+
+        with perf.span("diagram"):
+            if calc.base_k != old_k:
+                self.plotter.update_base(calc)
+            else:
+                self.plotter.clear_highlights()
+        with perf.span("curve plot"):
+            self.curve_plotter.plot(calc, true_func if true_func else None)
+        self._applied, self._results, self._errors = inputs, results, errors
+        self._fill_ledger(results, calc.truncation_info())
+        self._write_log(results, true_func, errors)
+        self.logger.separator()
+        self.logger.perf_report(perf)
+        self.logger.separator()
+        self.logger.cache_report(cache)
+
+    # 只改真实函数: 插值曲线取自缓存, 只重画真实曲线并更新误差
+    def _refunc(self, inputs):
+        true_func = inputs[4]
+        perf.reset()
+        errors = self._true_errors(self.calculator, true_func)
+        with perf.span("curve plot"):
+            self.curve_plotter.plot(self.calculator, true_func if true_func else None, self._selected_method())
+        self._applied, self._errors = inputs, errors
+        self._write_log(self._results, true_func, errors)
+        self.logger.separator()
+        self.logger.perf_report(perf)
+        self.logger.separator()
+        self.logger.cache_report(cache)
+
+    # 处理数据: 输入在主线程读取, 计算交给后台线程, 结果经队列由 root.after 轮询取回;
+    # 新的 CRAFT 会取消仍在进行的计算, 过期代次的结果直接丢弃. 已按 F9 时本次在主线程的 cProfile 下运行
+    def process_data(self, live=False):
+        perf.reset()
+        if self._cancel is not None: self._cancel.set()
+        self._generation += 1
+        self._cancel = threading.Event()
+        job = (self._generation, live, self._read_inputs())
+
+        self.progress.configure(value=0)
+        self.progress.grid()
+        if self.profile_next:
+            self.profile_next = False
+            _, rows = perf.profile(lambda: self._compute(job, self._cancel, self._handle), "craft.prof")
+            self.logger.profile_report(rows)
+            return
+        self._worker = threading.Thread(target=self._compute, args=(job, self._cancel, self._queue.put), daemon=True)
+        self._worker.start()
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    # 后台计算 (不访问任何 Tk 控件): 解析与差分表, 六种方法, 预编译曲线系数, 真实函数误差;
+    # 每个阶段结束后检查取消标志并通过 post 报告进度
+    def _compute(self, job, cancel, post):
+        generation, live, inputs = job
+        x_str, y_str, target_str, base_str, true_func, order_str, tol_str = inputs
+        calc = InterpolationCalculator(cache=cache)
+        try:
+            with perf.span("compute"):
+                calc.set_tol(tol_str)
+                calc.load_data(x_str, y_str, target_str, base_str, order_str)
+                post(("progress", generation, 1))
+                if cancel.is_set(): return
+                with perf.span("calculate_all"):
+                    results = calc.calculate_all()
+                post(("progress", generation, 2))
+                if cancel.is_set(): return
+                with perf.span("compile curves"):
+                    for method in (None,) + METHODS: calc.compile_method(method)
+                post(("progress", generation, 3))
+                if cancel.is_set(): return
+                errors = self._true_errors(calc, true_func)
+            post(("done", generation, (calc, results, errors, inputs)))
+        except Exception as e:
+            post(("error", generation, (str(e), live)))
+
+    # 主线程轮询结果队列, 后台线程结束且队列取空后停止
+    def _poll(self):
+        while not self._queue.empty():
+            self._handle(self._queue.get_nowait())
+        if not self._worker.is_alive() and self._queue.empty():
+            self._polling = False
+            return
+        self.root.after(self.poll_ms, self._poll)
+
+    # 处理一条后台消息; 代次不是最新的消息属于已取消的计算, 丢弃
+    def _handle(self, message):
+        kind, generation, payload = message
+        if generation != self._generation: return
+        if kind == "progress":
+            self.progress.configure(value=payload)
+            return
+        self.progress.grid_remove()
+        if kind == "error":
+            error, live = payload
+            # 实时模式下输入常处于编辑中途, 只提示错误并保留上一次的结果
+            if live:
+                self.logger.tag(f"Live: {error}", "warn")
+                return
+            self.logger.clear()
+            for item in self.tree.get_children():
+                self.tree.delete(item)
+            self.plotter.clear()
+            self._applied = None
+            messagebox.showerror("Broken Tool", error)
+            return
+        self._show_results(*payload)
+        self.logger.separator()
+        self.logger.perf_report(perf)
+        self.logger.separator()
+        self.logger.cache_report(cache)
+
+    # 在主线程中用计算结果更新弗雷瑟图, 曲线, 账本和日志
+    def _show_results(self, calc, results, errors, inputs):
+        true_func = inputs[4]
+        self.calculator = calc
+        self._applied, self._results, self._errors = inputs, results, errors
         self.plotter.clear()
 
-        try:
-            self.calculator.load_data(
-                self.entry_x.get(),
-                self.entry_y.get(),
-                self.entry_target.get(),
-                self.entry_base.get()
-            )
-            
+        with perf.span("diagram"):
             self.plotter.plot_diagram(self.calculator)
-            results = self.calculator.calculate_all()
 
-            # 默认曲线图
-            true_func = self.entry_func.get().strip()
+        # 默认曲线图
+        with perf.span("curve plot"):
             self.curve_plotter.plot(self.calculator, true_func if true_func else None)
+        with perf.span("render"):
+            self.root.update_idletasks()
 
-            # 显示结果
-            values_list = []
-            for m_name, val in results.items():
-                self.tree.insert("", "end", values=(m_name, f"{val:.6f}"))
-                values_list.append(val)
-            
-            avg_val = np.mean(values_list)
-            self.tree.insert("", "end", values=("-------", "-------"), tags=('separator_row',))
-            self.tree.insert("", "end", values=("AVERAGE", f"{avg_val:.6f}"), tags=('total_row',))
-
-            # 日志报告
-            self.logger.tag("[1] ITEM INSPECTION", "title")
-            self.logger.plain(f"• Step Size (h): {self.calculator.h}")
-            self.logger.plain(f"• Base Node (x0): {self.calculator.X[self.calculator.base_k]} (Index: {self.calculator.base_k})")
-            p = self.calculator.p
-            p_desc = "Center" if abs(p) < 0.1 else ("Right" if p > 0 else "Left")
-            self.logger.plain(f"• Position (p): {p:.3f} ({p_desc})")
-            
-            self.logger.separator()
-            self.logger.tag("[2] STABILITY CHECK", "title")
-            rng = max(values_list) - min(values_list)
-            if rng < 1e-5:
-                self.logger.tag("High Precision", "info")
-            elif rng < 0.1:
-                self.logger.tag("Minor Fluctuations", "accent")
-            else:
-                self.logger.tag("Unstable Results", "warn")
-            
-            self.logger.separator()
-            self.logger.tag("[3] INTERACTION", "title")
-            self.logger.tag("👉 Click LEDGER rows to see paths!", "accent")
-
-        except Exception as e:
-            messagebox.showerror("Broken Tool", str(e))
+        self._fill_ledger(results, calc.truncation_info())
+        self._write_log(results, true_func, errors)
 
+    # 显示结果; info 为各方法实际用到的最高阶与截断误差估计
+    def _fill_ledger(self, results, info):
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        for m_name, val in results.items():
+            order, est = info[m_name]
+            self.tree.insert("", "end", values=(m_name, f"{val:.6f}", order, f"{est:.1e}"))
+        
+        avg_val = np.mean(list(results.values()))
+        self.tree.insert("", "end", values=("-------", "-------", "", ""), tags=('separator_row',))
+        self.tree.insert("", "end", values=("AVERAGE", f"{avg_val:.6f}", "", ""), tags=('total_row',))
 
+    # 日志报告
+    def _write_log(self, results, true_func, errors):
+        values_list = list(results.values())
+        self.logger.clear()
+        self.logger.tag("[1] ITEM INSPECTION", "title")
+        self.logger.plain(f"• Step Size (h): {self.calculator.h}")
+        self.logger.plain(f"• Base Node (x0): {self.calculator.X[self.calculator.base_k]} (Index: {self.calculator.base_k})")
+        p = self.calculator.p
+        p_desc = "Center" if abs(p) < 0.1 else ("Right" if p > 0 else "Left")
+        self.logger.plain(f"• Position (p): {p:.3f} ({p_desc})")
+        if self.calculator.tol is not None or self.calculator.max_order < self.calculator.n - 1:
+            self.logger.plain(f"• Truncation: max order {self.calculator.max_order}, tol {self.calculator.tol}")
+        
+        self.logger.separator()
+        self.logger.tag("[2] STABILITY CHECK", "title")
+        rng = max(values_list) - min(values_list)
+        if rng < 1e-5:
+            self.logger.tag("High Precision", "info")
+        elif rng < 0.1:
+            self.logger.tag("Minor Fluctuations", "accent")
+        else:
+            self.logger.tag("Unstable Results", "warn")
+        if true_func:
+            self.log_true_errors(true_func, errors)
+        
+        self.logger.separator()
+        self.logger.tag("[3] INTERACTION", "title")
+        self.logger.tag("👉 Click LEDGER rows to see paths!", "accent")
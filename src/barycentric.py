@@ -0,0 +1,72 @@
+import math
+import numpy as np
+
+# 等距节点上全局插值多项式的重心形式, u = (x - x0) / h 为以步长为单位的位置, 权重 w_i = (-1)^i binom(n-1, i)
+# 与数据和步长无关, 只与节点数有关 (以对数幅值保存, 使用时按最大值归一化, n 较大时不溢出):
+#   第二公式 P(u) = sum(w_i y_i / (u - i)) / sum(w_i / (u - i))
+#   第一公式 P(u) = l(u) * sum(w_i y_i / (u - i)) * (-1)^(n-1) / (n-1)!,  l(u) = prod(u - i)
+# 用第二公式求值, 等距节点两端分母严重相消到 0 时改用第一公式 (l(u) 在对数域中计算).
+# 每点求值 O(n), 不经过差分表, 远离 X[0] 时不像牛顿前插那样受高阶项放大的影响
+class BarycentricWeights:
+    # 初始化: n 个节点的权重, log binom(n-1, i) 由相邻比值 (n - i) / i 的对数累加得到
+    def __init__(self, n):
+        i = np.arange(1, n)
+        self.n = n
+        self.logw = np.concatenate(([0.0], np.cumsum(np.log((n - i) / i))))
+        self._scale()
+
+    # 由对数幅值计算带符号的归一化权重 (-1)^i binom(n-1, i) / max, 以及公共因子的对数 log(max / (n-1)!)
+    def _scale(self):
+        top = self.logw.max()
+        self.weights = np.exp(self.logw - top)
+        self.weights[1::2] *= -1
+        self.log_scale = top - math.lgamma(self.n)
+
+    # 末尾追加一个节点: binom(n, i) = binom(n-1, i) * n / (n - i), 新节点 binom(n, n) = 1
+    def append(self):
+        n = self.n
+        self.logw = np.append(self.logw + np.log(n / (n - np.arange(n))), 0.0)
+        self.n = n + 1
+        self._scale()
+
+    # 删除首节点: binom(n-2, i) = binom(n-1, i+1) * (i+1) / (n-1)
+    def pop_front(self):
+        n = self.n
+        self.logw = self.logw[1:] + np.log(np.arange(1, n) / (n - 1))
+        self.n = n - 1
+        self._scale()
+
+    # 在位置 u (任意形状) 处求值, Y 为 (n,) 或 (n, 通道数), 结果形状为 u.shape + Y.shape[1:];
+    # 分子与分母由同一次矩阵乘法得到 (Y 后拼一列 1), 结果不是有限值的点改用第一公式,
+    # 落在节点上的点直接取该节点的值. 按块计算, 每块的临时矩阵约 64K 个元素 (留在缓存中)
+    def evaluate(self, u, Y):
+        u = np.asarray(u, dtype=float)
+        flat = u.ravel()
+        Y = np.asarray(Y, dtype=float)
+        Y1 = np.column_stack([Y.reshape(self.n, -1), np.ones(self.n)])
+        out = np.empty((len(flat), Y1.shape[1] - 1))
+        nodes = np.arange(self.n, dtype=float)
+        step = max(1, (1 << 16) // self.n)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for lo in range(0, len(flat), step):
+                q = np.subtract(flat[lo:lo + step, None], nodes)
+                s = np.divide(self.weights, q, out=q) @ Y1
+                num = s[:, :-1]
+                block = out[lo:lo + step]
+                np.divide(num, s[:, -1:], out=block)
+                bad = np.flatnonzero(~np.isfinite(block).all(axis=1))
+                if len(bad): block[bad] = num[bad] * self._first_factor(flat[lo + bad], nodes)[:, None]
+        # u 由 (x - x0) / h 算出, 节点处带有约 n*eps 的舍入误差; 两端权重相对最大值可小到 1e-59,
+        # 该节点的项在这样的误差下不再占主导, 因此在容差内吸附到节点
+        near = np.round(flat)
+        exact = np.flatnonzero((np.abs(flat - near) <= 4 * self.n * np.finfo(float).eps) & (near >= 0) & (near <= self.n - 1))
+        out[exact] = Y1[near[exact].astype(int), :-1]
+        return out.reshape(u.shape + Y.shape[1:])
+
+    # 第一公式中 sum(w_i y_i / (u - i)) 的因子 l(u) (-1)^(n-1) / (n-1)! (乘以归一化的公共因子);
+    # l(u) 的符号为 (-1)^(大于 u 的节点数)
+    def _first_factor(self, u, nodes):
+        d = u[:, None] - nodes
+        above = self.n - np.clip(np.floor(u) + 1, 0, self.n)
+        sign = np.where((above + self.n - 1) % 2 == 1, -1.0, 1.0)
+        return sign * np.exp(np.log(np.abs(d)).sum(axis=1) + self.log_scale)
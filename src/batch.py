@@ -0,0 +1,214 @@
+import csv
+import json
+import os
+import sys
+from functools import partial
+from itertools import islice
+
+import numpy as np
+
+from .calculator import InterpolationCalculator, METHODS, ENGINES
+from .diff_table import DTYPES
+
+# 无界面批量插值
+# 输入: CSV / JSONL / .npz, 每条任务为一组等距节点及一个或多个目标点
+# 输出: 每个 (任务, 目标) 一条记录, 以 JSONL 或 CSV 流式写出
+
+# 各方法的值, 全局多项式的值 ("global"), 实际用到的最高阶 ("<方法> order") 与截断误差估计 ("<方法> est")
+FIELDS = (("id", "target", "base_k", "p") + METHODS + ("global",) + tuple(f"{m} order" for m in METHODS)
+          + tuple(f"{m} est" for m in METHODS) + ("error",))
+
+
+# 解析 "1, 2, 3" / "1;2;3" / "1 2 3" 形式的数列
+def _parse_list(text):
+    text = str(text).replace('，', ',').replace(';', ',')
+    parts = text.split(',') if ',' in text else text.split()
+    return np.array([s for s in parts if s.strip()], dtype=float)
+
+
+# 结果值转为可写出的数: 多通道任务 (y 为 n x 通道数) 的值为逐通道的列表
+def _plain(value):
+    return np.asarray(value, dtype=float).tolist() if np.ndim(value) else float(value)
+
+
+# 无法解析的任务行: run_job 对它只输出一条带 error 的记录, 不中断整批
+def _bad_job(job_id, e):
+    return {"id": job_id, "error": f"Invalid job: {e}"}
+
+
+# 读取 CSV 任务: 列 id, x, y, target, [base], [max_order], [tol], [engine]
+def _read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            job_id = row.get("id") or str(i)
+            try:
+                job = {
+                    "id": job_id,
+                    "x": _parse_list(row["x"]),
+                    "y": _parse_list(row["y"]),
+                    "target": _parse_list(row["target"]),
+                    "base": row.get("base") or None,
+                    "max_order": row.get("max_order") or None,
+                    "tol": row.get("tol") or None,
+                    "engine": row.get("engine") or None,
+                }
+            except (KeyError, TypeError, ValueError) as e:
+                job = _bad_job(job_id, e)
+            yield job
+
+
+# 读取 JSONL 任务: 每行 {"id", "x" 或 "x0" 与 "h", "y", "target", ["base"], ["max_order"], ["tol"], ["dtype"], ["engine"]}
+def _read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for i, line in enumerate(f):
+            if not line.strip(): continue
+            job_id = str(i)
+            try:
+                rec = json.loads(line)
+                job_id = rec.get("id", job_id)
+                job = {
+                    "id": job_id,
+                    "x": np.asarray(rec["x"], dtype=float) if "x" in rec else None,
+                    "x0": rec.get("x0"),
+                    "h": rec.get("h"),
+                    "y": np.asarray(rec["y"], dtype=float),
+                    "target": np.atleast_1d(np.asarray(rec["target"], dtype=float)),
+                    "base": rec.get("base"),
+                    "max_order": rec.get("max_order"),
+                    "tol": rec.get("tol"),
+                    "dtype": rec.get("dtype"),
+                    "engine": rec.get("engine"),
+                }
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                job = _bad_job(job_id, e)
+            yield job
+
+
+# 读取 .npz 任务: Y 为 (任务数, n); X 为 (n,) 共用或 (任务数, n), 或用标量 x0 与 h 表示共用的均匀网格;
+# target 为 (任务数,) 或 (任务数, 目标数)
+def _read_npz(path):
+    with np.load(path) as data:
+        Y = np.atleast_2d(data["Y"])
+        X = np.broadcast_to(data["X"], Y.shape) if "X" in data else None
+        x0 = float(data["x0"]) if X is None else None
+        h = float(data["h"]) if X is None else None
+        T = data["target"]
+        T = T.reshape(len(Y), -1) if T.ndim > 0 else np.full((len(Y), 1), float(T))
+        base = data["base"] if "base" in data else None
+        ids = data["id"] if "id" in data else np.arange(len(Y))
+        for i in range(len(Y)):
+            yield {
+                "id": ids[i].item(),
+                "x": None if X is None else X[i],
+                "x0": x0,
+                "h": h,
+                "y": Y[i],
+                "target": T[i],
+                "base": None if base is None else int(base[i]),
+                "max_order": None,
+            }
+
+
+# 按扩展名读取任务
+def read_jobs(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv": return _read_csv(path)
+    if ext in (".jsonl", ".ndjson"): return _read_jsonl(path)
+    if ext == ".npz": return _read_npz(path)
+    raise ValueError(f"Unsupported input format: {ext}")
+
+
+# 计算单个任务 (子进程中执行): 差分表只构建一次, 各目标只移动目标点; 任务未指定 dtype / tol / engine 时用参数的值
+def run_job(job, dtype="float64", tol=None, engine="newton"):
+    if "error" in job: return [{"id": job["id"], "error": job["error"]}]
+    targets = np.atleast_1d(job["target"])
+    # 任务配置 (dtype / tol / engine) 只检查一次, 无效时该任务的每条记录都报错
+    try:
+        calc = InterpolationCalculator(job.get("dtype") or dtype, job.get("tol") if job.get("tol") is not None else tol,
+                                       engine=job.get("engine") or engine)
+    except Exception as e:
+        return [{"id": job["id"], "target": float(target), "error": str(e)} for target in targets]
+    records = []
+    for i, target in enumerate(targets):
+        rec = {"id": job["id"], "target": float(target)}
+        try:
+            if i == 0 or calc.Y is None:
+                if job.get("x") is None:
+                    calc.load_uniform(job["x0"], job["h"], job["y"], target, job.get("base"), job.get("max_order"))
+                else:
+                    calc.load_arrays(job["x"], job["y"], target, job.get("base"), job.get("max_order"))
+            else:
+                calc.set_target(target, job.get("base"))
+            rec["base_k"] = calc.base_k
+            rec["p"] = float(calc.p)
+            rec.update({m: _plain(v) for m, v in calc.calculate_all().items()})
+            rec["global"] = _plain(calc.get_interpolated_value(target))
+            for m, (order, est) in calc.truncation_info().items():
+                rec[f"{m} order"], rec[f"{m} est"] = order, _plain(est)
+        except Exception as e:
+            rec["error"] = str(e)
+        records.append(rec)
+    return records
+
+
+# 以进程池分块执行全部任务, 按输入顺序逐条产出结果记录
+def run_batch(jobs, workers=None, chunksize=16, dtype="float64", tol=None, engine="newton"):
+    jobs = iter(jobs)
+    if workers == 1:
+        for job in jobs:
+            yield from run_job(job, dtype, tol, engine)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 每次只提交有限数量的任务, 使内存占用不随任务总数增长
+        block = chunksize * workers * 4
+        while True:
+            batch = list(islice(jobs, block))
+            if not batch: break
+            for records in pool.map(partial(run_job, dtype=dtype, tol=tol, engine=engine), batch, chunksize=chunksize):
+                yield from records
+
+
+# 按扩展名流式写出结果 (.csv 或 JSONL), 返回记录数
+def write_results(records, out):
+    count = 0
+    is_csv = isinstance(out, str) and out.lower().endswith(".csv")
+    f = sys.stdout if out in (None, "-") else open(out, "w", newline='', encoding='utf-8')
+    try:
+        if is_csv:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+        for rec in records:
+            if is_csv:
+                writer.writerow(rec)
+            else:
+                f.write(json.dumps(rec) + "\n")
+            count += 1
+    finally:
+        if f is not sys.stdout: f.close()
+    return count
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m src.batch", description="Headless batch interpolation")
+    parser.add_argument("input", help="jobs file (.csv, .jsonl or .npz)")
+    parser.add_argument("-o", "--output", default="-", help="result file (.csv or .jsonl), default stdout")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes, default all cores")
+    parser.add_argument("-c", "--chunksize", type=int, default=16, help="jobs per dispatched chunk")
+    parser.add_argument("--dtype", choices=sorted(DTYPES), default="float64", help="difference table precision")
+    parser.add_argument("--tol", type=float, default=None, help="stop summing once two successive terms are below this")
+    parser.add_argument("--engine", choices=ENGINES, default="newton", help="global polynomial evaluation")
+    args = parser.parse_args(argv)
+
+    jobs = read_jobs(args.input)
+    count = write_results(run_batch(jobs, args.workers, args.chunksize, args.dtype, args.tol, args.engine), args.output)
+    print(f"{count} results written", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from .perf import perf
+
+
+# 按内容寻址的 LRU 缓存: 键为 (种类, 内容哈希, ...) 元组, 如 ("table", 数据哈希, 阶数, dtype);
+# 按条目数与内存预算淘汰最久未用的条目. 命中/未命中按种类 (键的第一项) 分别累计, 可在后台线程中使用
+class LRUCache:
+    # 初始化: 最多 max_entries 条, 总大小不超过 max_bytes 字节
+    def __init__(self, max_entries=256, max_bytes=256 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.clear()
+
+    # 清空条目与统计
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self.nbytes = 0
+            self.hits = {}
+            self.misses = {}
+            self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    # 取条目并移到最近使用端, 未命中时返回 default
+    def get(self, key, default=None):
+        kind = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits[kind] = self.hits.get(kind, 0) + 1
+            else:
+                self.misses[kind] = self.misses.get(kind, 0) + 1
+        perf.count(f"{kind} cache {'hits' if entry is not None else 'misses'}")
+        return default if entry is None else entry[0]
+
+    # 存入条目 (nbytes 缺省时按其中的数组估算), 超出条目数或内存预算时淘汰最久未用的条目;
+    # 单个条目超过预算时不缓存
+    def put(self, key, value, nbytes=None):
+        nbytes = _sizeof(value) if nbytes is None else nbytes
+        if nbytes > self.max_bytes: return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None: self.nbytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self.nbytes -= size
+                self.evictions += 1
+
+    # 各种类的 (命中, 未命中)
+    def stats(self):
+        kinds = list(self.hits) + [k for k in self.misses if k not in self.hits]
+        return {kind: (self.hits.get(kind, 0), self.misses.get(kind, 0)) for kind in kinds}
+
+
+# 估算条目大小: 数组 (及带 nbytes 的对象) 按实际字节数, 容器逐项累加, 其余按 64 字节计
+def _sizeof(value):
+    if isinstance(value, np.ndarray) or hasattr(value, "nbytes"): return int(value.nbytes)
+    if isinstance(value, dict): return 64 + sum(_sizeof(v) for v in value.values())
+    if isinstance(value, (tuple, list)): return 64 + sum(_sizeof(v) for v in value)
+    return 64
+
+
+# 全局缓存, 由界面的计算器与曲线图共用
+cache = LRUCache()
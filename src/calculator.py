@@ -1,15 +1,32 @@
+import hashlib
 import numpy as np
-import math
+from .diff_table import DiffTable, DTYPES
+from .perf import perf
+from .stencil import method_plan
+from .barycentric import BarycentricWeights
+
+# 六种插值方法 (结果与账本的顺序)
+METHODS = ('Newton F', 'Newton B', 'Gauss F', 'Gauss B', 'Stirling', 'Bessel')
+# 全局多项式的求值方式: 牛顿前插的嵌套形式, 或重心形式 (见 barycentric.py)
+ENGINES = ('newton', 'barycentric')
 
 # 插值计算器类
 class InterpolationCalculator:
-    # 初始化
-    def __init__(self):
+    # 初始化; dtype 为差分表的数值类型 (float32 / float64 / longdouble), tol 为提前终止的容差 (见 set_tol);
+    # cache 为共用的 LRUCache (见 cache.py), 缓存解析结果, 差分表与 calculate_all 的结果, None 时不缓存;
+    # engine 为全局多项式的求值方式 (ENGINES 之一)
+    def __init__(self, dtype=np.float64, tol=None, cache=None, engine='newton'):
+        self.dtype = self._parse_dtype(dtype)
+        self.tol = None
+        self.cache = cache
+        self.engine = self._parse_engine(engine)
         self.reset()
+        self.set_tol(tol)
 
     # 重置数据
     def reset(self):
-        self.X = None
+        self._X = None
+        self.x0 = None
         self.Y = None
         self.diff_table = None
         self.h = None
@@ -17,186 +34,545 @@ class InterpolationCalculator:
         self.base_k = None
         self.p = None
         self.n = 0
+        self.max_order = None
+        self._order_cap = None
+        self._force_base = None
+        self._y_owned = False
+        self._digest = None
+        self._table_shared = False
+        self._bary = None
+        self._compiled = {}
+        self._results = {}
+
+    # 节点数组; 以 (x0, h) 加载的均匀网格在首次访问时才生成
+    @property
+    def X(self):
+        if self._X is None and self.x0 is not None:
+            self._X = self.x0 + self.h * np.arange(self.n)
+        return self._X
+
+    @X.setter
+    def X(self, value):
+        self._X = None if value is None else np.asarray(value, dtype=float)
+        self.x0 = None if value is None else self._X[0]
+        self._digest = None
+
+    # 第 i 个节点的 x (不生成整个节点数组)
+    def node(self, i):
+        return self._X[i] if self._X is not None else self.x0 + i * self.h
 
     # 加载数据
-    def load_data(self, x_str, y_str, target_str, force_base_index=None):
-        if not target_str: raise ValueError("Target X is empty")
-        self.target_x = float(target_str)
+    def load_data(self, x_str, y_str, target_str, force_base_index=None, max_order=None):
+        with perf.span("parse"):
+            if not target_str: raise ValueError("Target X is empty")
+            target_x = float(target_str)
+
+            key = ("parse", x_str, y_str)
+            parsed = None if self.cache is None else self.cache.get(key)
+            if parsed is None:
+                x_arr = np.array(x_str.replace('，', ',').split(','), dtype=float)
+                y_arr = np.array(y_str.replace('，', ',').split(','), dtype=float)
+                # 缓存中的数组只读, 修改 Y 时 update_value 会先复制
+                for arr in (x_arr, y_arr): arr.setflags(write=False)
+                if self.cache is not None: self.cache.put(key, (x_arr, y_arr))
+            else:
+                x_arr, y_arr = parsed
 
-        x_arr = np.array([float(x) for x in x_str.replace('，', ',').split(',')])
-        y_arr = np.array([float(y) for y in y_str.replace('，', ',').split(',')])
+        self.load_arrays(x_arr, y_arr, target_x, force_base_index, max_order)
 
-        if len(x_arr) != len(y_arr): raise ValueError("Mismatch Len")
-        diff = np.diff(x_arr)
-        if not np.allclose(diff, diff[0]): raise ValueError("Not Equal Dist")
+    # 从数组加载数据; 数组 (包括只读的内存映射) 直接引用不复制, 需要修改 Y 时才复制一份
+    # Y 为 (n,) 或 (n, 通道数): 多通道共用节点, 步长, 基点与二项式系数, 各方法的值为逐通道的数组
+    def load_arrays(self, X, Y, target_x, force_base_index=None, max_order=None):
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        if X.ndim != 1: raise ValueError("X must be 1-D")
+        if Y.ndim not in (1, 2): raise ValueError("Y must be 1-D or (n, channels)")
+        if len(X) != len(Y): raise ValueError("Mismatch Len")
+        if len(X) < 2: raise ValueError("At least 2 nodes required")
+        # 等距检查 (与 np.allclose(diff, diff[0]) 相同), 只用一个临时数组
+        h = X[1] - X[0]
+        diff = np.diff(X)
+        np.abs(np.subtract(diff, h, out=diff), out=diff)
+        if not diff.max() <= 1e-8 + 1e-5 * abs(h): raise ValueError("Not Equal Dist")
+        self._load(X, X[0], h, Y, target_x, force_base_index, max_order)
+
+    # 从均匀网格加载数据: 节点为 x0 + i h, 不生成节点数组
+    def load_uniform(self, x0, h, Y, target_x, force_base_index=None, max_order=None):
+        Y = np.asarray(Y, dtype=float)
+        if Y.ndim not in (1, 2): raise ValueError("Y must be 1-D or (n, channels)")
+        if len(Y) < 2: raise ValueError("At least 2 nodes required")
+        h = float(h)
+        if not np.isfinite(h) or h == 0: raise ValueError(f"Invalid Step Size: {h}")
+        self._load(None, float(x0), h, Y, target_x, force_base_index, max_order)
+
+    # 从文件加载数据 (.csv / .npy / .npz, 后两者默认内存映射), 见 loaders.read_file
+    def load_file(self, path, target_x, force_base_index=None, max_order=None, mmap=True):
+        from .loaders import read_file
+
+        with perf.span("read file"):
+            X, Y, x0, h = read_file(path, mmap=mmap)
+        if X is None:
+            self.load_uniform(x0, h, Y, target_x, force_base_index, max_order)
+        else:
+            self.load_arrays(X, Y, target_x, force_base_index, max_order)
 
-        self.X = x_arr
-        self.Y = y_arr
-        self.h = diff[0]
-        self.n = len(self.X)
+    def _load(self, X, x0, h, Y, target_x, force_base_index, max_order):
+        old_state = (self._X, self.x0, self.h, self.Y, self.base_k, self.max_order)
+        self._X = X
+        self.x0 = x0
+        self.h = h
+        self.Y = Y
+        self._y_owned = False
+        self._digest = None
+        self.n = len(Y)
+        self.target_x = float(target_x)
+        # 重心权重只与节点数有关
+        if self._bary is not None and self._bary.n != self.n: self._bary = None
         
-        # 计算 base_k
-        if force_base_index is not None and str(force_base_index).strip() != "":
+        self._force_base = self._parse_base(force_base_index)
+        self._update_base()
+        
+        with perf.span("diff table"):
+            self._build_diff_table(max_order)
+
+        # 节点, Y 或基点变化时丢弃已编译的方法系数 (同一数组对象可能已被原地修改, 也视为变化)
+        old_X, old_x0, old_h, old_Y, old_k, old_order = old_state
+        same_nodes = (old_x0 == x0 and old_h == h and (old_X is None) == (X is None)
+                      and (X is None or (old_X is not X and np.array_equal(old_X, X))))
+        if (old_Y is None or old_k != self.base_k or old_order != self.max_order or not same_nodes
+                or old_Y is Y or not np.array_equal(old_Y, Y)):
+            self._compiled = {}
+            self._results = {}
+
+    # 解析强制基点, 未指定时返回 None
+    def _parse_base(self, force_base_index):
+        if force_base_index is None or str(force_base_index).strip() == "": return None
+        try:
+            idx = int(force_base_index)
+            if 0 <= idx < self.n:
+                return idx
+            else:
+                raise ValueError(f"Base Index {idx} out of bounds (0-{self.n-1})")
+        except ValueError as e:
+            if "out of bounds" in str(e):
+                raise e
+            raise ValueError(f"Invalid Base Index: {force_base_index}")
+
+    # 只修改目标点 (及强制基点), 差分表保持不变
+    def set_target(self, target_x, force_base_index=None):
+        if self.Y is None: raise ValueError("No data loaded")
+        old_k = self.base_k
+        force_base = self._parse_base(force_base_index)
+        self.target_x = float(target_x)
+        self._force_base = force_base
+        self._update_base()
+        self._invalidate(set(), self.base_k == old_k)
+
+    # 设置提前终止的容差: 逐阶求和时连续两项的绝对值都不超过 tol 即停止; None 或空串表示求和到最高阶
+    def set_tol(self, tol):
+        if tol is None or str(tol).strip() == "":
+            tol = None
+        else:
+            try:
+                value = float(tol)
+            except ValueError:
+                raise ValueError(f"Invalid Tol: {tol}")
+            if not value >= 0: raise ValueError(f"Invalid Tol: {tol}")
+            tol = value
+        if tol != self.tol: self._results = {}
+        self.tol = tol
+
+    # 检查差分表的数值类型: 只接受 DTYPES 中的名称或类型 (整数等类型会截断差分, 不报错地给出错误结果)
+    def _parse_dtype(self, dtype):
+        try:
+            value = np.dtype(DTYPES.get(dtype, dtype))
+        except TypeError:
+            raise ValueError(f"Invalid Dtype: {dtype}")
+        if value not in [np.dtype(t) for t in DTYPES.values()]: raise ValueError(f"Invalid Dtype: {dtype}")
+        return value
+
+    # 检查求值方式, 不在 ENGINES 中时报错
+    def _parse_engine(self, engine):
+        if engine not in ENGINES: raise ValueError(f"Invalid Engine: {engine}")
+        return engine
+
+    # 选择全局多项式的求值方式
+    def set_engine(self, engine):
+        self.engine = self._parse_engine(engine)
+
+    # 确定基点与 p; p 变化时丢弃已缓存的结果
+    def _update_base(self):
+        if self._force_base is not None:
+            self.base_k = self._force_base
+        elif self._X is None:
+            # 均匀网格上的最近节点, 与 argmin 一致: 距离相等时取较小的下标
+            u = (self.target_x - self.x0) / self.h
+            self.base_k = int(min(max(np.ceil(u - 0.5), 0), self.n - 1))
+        else:
+            self.base_k = int(self._nearest_nodes(self.target_x))
+        p = (self.target_x - self.node(self.base_k)) / self.h
+        if p != self.p: self._results = {}
+        self.p = p
+
+    # 各目标点的最近节点下标, 距离相等时取较小的下标; 节点数组上二分查找
+    def _nearest_nodes(self, targets):
+        t = np.asarray(targets, dtype=float)
+        if self._X is None:
+            return np.clip(np.ceil((t - self.x0) / self.h - 0.5), 0, self.n - 1).astype(int)
+        # h < 0 时节点递减, 在倒序数组上查找
+        asc = self._X if self.h > 0 else self._X[::-1]
+        i = np.clip(np.searchsorted(asc, t), 1, self.n - 1)
+        d_left, d_right = np.abs(t - asc[i - 1]), np.abs(asc[i] - t)
+        if self.h > 0: return np.where(d_left <= d_right, i - 1, i)
+        return self.n - 1 - np.where(d_left < d_right, i - 1, i)
+
+    # 构建差分表 (逐阶级联, 每阶一次连续切片相减), 存储见 DiffTable; 有缓存时相同数据与阶数的表直接复用
+    def _build_diff_table(self, max_order=None):
+        n = self.n
+        if max_order is not None and str(max_order).strip() != "":
+            # 按文本解析, "2.5" 或 2.5 不会被截断为 2
             try:
-                idx = int(force_base_index)
-                if 0 <= idx < self.n:
-                    self.base_k = idx
-                else:
-                    raise ValueError(f"Base Index {idx} out of bounds (0-{self.n-1})")
-            except ValueError as e:
-                if "out of bounds" in str(e):
-                    raise e
-                raise ValueError(f"Invalid Base Index: {force_base_index}")
+                value = int(str(max_order).strip())
+            except ValueError:
+                raise ValueError(f"Invalid Max Order: {max_order}")
+            if value < 0: raise ValueError(f"Invalid Max Order: {max_order}")
+            self._order_cap = value
         else:
-            self.base_k = int(np.abs(self.X - self.target_x).argmin())
-            
-        self.p = (self.target_x - self.X[self.base_k]) / self.h
-        
-        self._build_diff_table()
+            self._order_cap = None
+        self.max_order = self._capped_order(n)
+
+        key = None if self.cache is None else ("table", self.data_key(), self.dtype.str)
+        T = None if key is None else self.cache.get(key)
+        self._table_shared = T is not None
+        if T is None:
+            cols = self.max_order + 1
+            T = DiffTable(n, cols, self.dtype, self.Y.shape[1:])
+            prev = T.column(0)
+            prev[:] = self.Y
+            for j in range(1, cols):
+                col = T.column(j)
+                np.subtract(prev[1:], prev[:-1], out=col)
+                prev = col
+            if key is not None:
+                self.cache.put(key, T)
+                self._table_shared = True
+        self.diff_table = T
+
+    # 增量修改前: 与缓存共用的差分表先复制一份, 内容哈希作废
+    def _detach(self):
+        if self._table_shared:
+            self.diff_table = self.diff_table.copy()
+            self._table_shared = False
+        self._digest = None
+
+    def _capped_order(self, n):
+        return n - 1 if self._order_cap is None else min(self._order_cap, n - 1)
+
+    # 当前已缓存的方法中, 读取了 touched(rows, orders) 为真的有效单元格的方法
+    def _methods_reading(self, touched):
+        stale = set()
+        for method in set(self._compiled) | set(self._results):
+            plan = self.plan(method)
+            rows, orders = plan.rows, plan.orders
+            valid = (rows >= 0) & (rows <= self.n - 1 - orders) & (orders <= self.max_order)
+            if np.any(valid & touched(rows, orders)): stale.add(method)
+        return stale
+
+    # 选择性失效: 基点不再是同一节点时全部丢弃, 否则只丢弃 stale 中的方法
+    def _invalidate(self, stale, same_base):
+        if not same_base:
+            self._compiled = {}
+            self._results = {}
+            return
+        for method in stale:
+            self._compiled.pop(method, None)
+            self._results.pop(method, None)
+
+    # 在末尾追加一个等距节点 (x = X[-1] + h), 只计算新增的一条反对角线
+    def append_node(self, y):
+        if self.Y is None: raise ValueError("No data loaded")
+        old_k = self.base_k
+        n = self.n + 1
+        cols = self._capped_order(n) + 1
+        self._detach()
+        T = self.diff_table
+        T.reserve(n, cols)
+
+        # 新反对角线 d'_j = d'_{j-1} - d_{j-1}, d 为原反对角线 (行 n-2-j, 阶 j)
+        j = np.arange(cols)
+        prev = T.take(n - 2 - j[:-1], j[:-1])
+        T.n, T.cols = n, cols
+        y = np.asarray(y, dtype=float).reshape((1,) + self.Y.shape[1:])
+        T[n - 1 - j, j] = np.subtract.accumulate(np.concatenate((y, prev)).astype(T.dtype))
+
+        if self._X is not None: self._X = np.append(self._X, self._X[-1] + self.h)
+        self.Y = np.concatenate((self.Y, y))
+        self._y_owned = True
+        self.n = n
+        if self._bary is not None: self._bary.append()
+        self.max_order = cols - 1
+        self._update_base()
+        self._invalidate(self._methods_reading(lambda rows, orders: rows + orders == n - 1), self.base_k == old_k)
+
+    # 删除最前面的节点, 其余差分值不变, 只移动视图
+    def pop_front(self):
+        if self.n <= 2: raise ValueError("Too few nodes")
+        old_k = self.base_k
+        stale = self._methods_reading(lambda rows, orders: rows == 0)
 
-    # 构建差分表
-    def _build_diff_table(self):
-        self.diff_table = np.zeros((self.n, self.n))
-        self.diff_table[:, 0] = self.Y
-        for j in range(1, self.n):
-            for i in range(self.n - j):
-                self.diff_table[i][j] = self.diff_table[i+1][j-1] - self.diff_table[i][j-1]
+        self._detach()
+        self.n -= 1
+        if self._X is not None: self._X = self._X[1:]
+        self.x0 = self._X[0] if self._X is not None else self.x0 + self.h
+        self.Y = self.Y[1:]
+        if self._bary is not None: self._bary.pop_front()
+        self.max_order = self._capped_order(self.n)
+        T = self.diff_table
+        T.row0, T.n, T.cols = T.row0 + 1, self.n, self.max_order + 1
+        if self._force_base is not None: self._force_base = max(self._force_base - 1, 0)
+        self._update_base()
+        self._invalidate(stale, self.base_k == old_k - 1)
 
-    # 计算二项式系数
+    # 修改第 i 个 Y 值, 只重算受影响的差分 (第 j 阶的行 i-j..i)
+    def update_value(self, i, y):
+        if self.Y is None: raise ValueError("No data loaded")
+        if not 0 <= i < self.n: raise ValueError(f"Node Index {i} out of bounds (0-{self.n-1})")
+        self._detach()
+        T = self.diff_table
+        if not self._y_owned:
+            self.Y = self.Y.copy()
+            self._y_owned = True
+        self.Y[i] = y
+        prev = T.column(0)
+        prev[i] = y
+        for j in range(1, self.max_order + 1):
+            lo, hi = max(i - j, 0), min(i, self.n - 1 - j)
+            col = T.column(j)
+            np.subtract(prev[lo+1:hi+2], prev[lo:hi+1], out=col[lo:hi+1])
+            prev = col
+        self._invalidate(self._methods_reading(lambda rows, orders: (rows <= i) & (i <= rows + orders)), True)
+
+    # 计算二项式系数 (逐项比值相乘, 不计算阶乘)
     def binom(self, n, k):
         if k < 0: return 0
-        if k == 0: return 1.0
         res = 1.0
-        for i in range(k): res = res * (n - i)
-        return res / math.factorial(k)
+        for i in range(k): res = res * (n - i) / (i + 1)
+        return res
+
+    # 相邻两阶系数的比值偏移: binom(p + s_{j+1}, j + 1) = binom(p + s_j, j) * (p + c_j) / (j + 1)
+    # 要求 s_{j+1} - s_j 为 0 或 1 (0 阶系数恒为 1, 不受 s_0 限制)
+    def _ratio_offsets(self, n, shift=0):
+        s = np.broadcast_to(np.asarray(shift, dtype=int), (n,)).copy()
+        if n > 1: s[0] = s[1]
+        step = np.diff(s)
+        if np.any((step != 0) & (step != 1)): raise ValueError("Shift step must be 0 or 1")
+        j = np.arange(n - 1)
+        return np.where(step == 0, s[:-1] - j, s[1:])
+
+    # binom(p + s_j, j), j = 0..n-1 (shift 为常数或逐阶偏移序列), 由相邻比值累积相乘得到; 返回形状为 p.shape + (n,) 的系数矩阵
+    def binom_matrix(self, p, n, shift=0):
+        p = np.asarray(p, dtype=float)
+        coef = np.ones(p.shape + (max(n, 0),))
+        if n > 1:
+            ratios = (p[..., None] + self._ratio_offsets(n, shift)) / np.arange(1, n)
+            np.cumprod(ratios, axis=-1, out=coef[..., 1:])
+        return coef
 
     def get_diff(self, row, order):
         if row < 0 or row >= self.n or row > self.n - 1 - order: return 0.0
-        return self.diff_table[row][order]
+        if order > self.max_order: return 0.0
+        return self.diff_table[row, order]
+
+    # 数据内容键: 节点与阶数上限相同的数据集得到相同的键, 供曲线等缓存使用
+    # 哈希在加载或增量修改后首次调用时计算一次
+    def data_key(self):
+        if self.Y is None: return None
+        if self._digest is None:
+            digest = hashlib.blake2b(digest_size=16)
+            if self._X is None:
+                digest.update(np.array([self.x0, self.h]).tobytes())
+            else:
+                digest.update(np.ascontiguousarray(self._X).tobytes())
+            digest.update(str(self.Y.shape).encode())
+            digest.update(np.ascontiguousarray(self.Y).tobytes())
+            self._digest = digest.hexdigest()
+        return (self.n, self.max_order, self._digest)
+
+    # 全局多项式实际使用的求值方式 (engine 缺省为 self.engine)
+    def global_engine(self, engine=None):
+        engine = self.engine if engine is None else self._parse_engine(engine)
+        return engine if self.max_order == self.n - 1 else 'newton'
 
-    # 计算任意点的插值多项式值
-    def get_interpolated_value(self, x):
-        if self.X is None or self.n == 0:
+    # 计算任意点的插值多项式值 (多通道时为逐通道的数组)
+    def get_interpolated_value(self, x, engine=None):
+        if self.Y is None or self.n == 0:
             return 0
-        
-        # p = (x - x0) / h
-        p = (x - self.X[0]) / self.h
-        
-        val = 0
-        # P(x) = sum( binom(p, j) * diff_table[0][j] )
-        for j in range(self.n):
-            term = self.binom(p, j) * self.diff_table[0][j]
-            val += term
-            
-        return val
-
-    # 计算特定方法的插值值
+        val = self.evaluate(None, x, engine)
+        return float(val) if self.Y.ndim == 1 else val
+
+    # 计算特定方法的插值值 (逐阶求和, 按 tol 提前终止)
     def calculate_method_value(self, method, x):
-        if self.X is None: return 0
-        
-        k = self.base_k
-        n = self.n
-        # p 是相对于 base_k 的位置
-        p = (x - self.X[k]) / self.h
-        
-        val = 0
-        
-        if method == 'Newton F':
-            val = sum(self.binom(p, j) * self.get_diff(k, j) for j in range(n) if k <= n-1-j)
-            
-        elif method == 'Newton B':
-            val = sum(self.binom(p + j - 1, j) * self.get_diff(k - j, j) for j in range(n) if k - j >= 0)
-            
-        elif method == 'Gauss F':
-            for j in range(n):
-                row = k - (j // 2)
-                m = j // 2
-                coef = self.binom(p + m - 1, j) if (j > 0 and j % 2 == 0) else self.binom(p + m, j)
-                val += coef * self.get_diff(row, j)
-                
-        elif method == 'Gauss B':
-            for j in range(n):
-                row = k - ((j + 1) // 2)
-                m = j // 2
-                coef = self.binom(p + m, j)
-                val += coef * self.get_diff(row, j)
-                
-        elif method == 'Stirling':
-            val_gf = 0
-            for j in range(n):
-                row = k - (j // 2)
-                m = j // 2
-                coef = self.binom(p + m - 1, j) if (j > 0 and j % 2 == 0) else self.binom(p + m, j)
-                val_gf += coef * self.get_diff(row, j)
-            
-            val_gb = 0
-            for j in range(n):
-                row = k - ((j + 1) // 2)
-                m = j // 2
-                coef = self.binom(p + m, j)
-                val_gb += coef * self.get_diff(row, j)
-            
-            val = (val_gf + val_gb) / 2
-            
-        elif method == 'Bessel':
-            for m in range(n // 2 + 1):
-                j2 = 2 * m
-                if j2 < n:
-                    coef = 1 if m == 0 else self.binom(p + m - 1, j2)
-                    mean_diff = (self.get_diff(k-m, j2) + self.get_diff(k-m+1, j2))/2
-                    val += coef * mean_diff
-                j3 = 2 * m + 1
-                if j3 < n:
-                    coef = (1 if m == 0 else self.binom(p + m - 1, 2*m)) * (p-0.5)/(2*m+1)
-                    val += coef * self.get_diff(k-m, j3)
-                    
-        return val
+        if self.Y is None: return 0
+        val = self.sum_terms(method, (x - self.node(self.base_k)) / self.h)[0]
+        return float(val) if self.Y.ndim == 1 else val
+
+    # 方法在当前节点数与基点上的模板 (见 stencil.method_plan), 计算器与弗雷瑟图共用; 全局多项式与基点无关
+    def plan(self, method):
+        return method_plan(method, self.n, 0 if method is None else self.base_k)
+
+    # 将方法编译为嵌套 (霍纳) 形式并按方法缓存
+    def compile_method(self, method):
+        if method in self._compiled: return self._compiled[method]
+        a, c = self._compile(self.plan(method), np.array([0]))
+        self._compiled[method] = (a[0], c)
+        return a[0], c
+
+    # 按模板 plan 在基点偏移 bases 上编译方法 (模板的行加上偏移即为读取的行; 基点为 0 的模板配合各基点)
+    # 同一方法的项最多落在两条系数链上, 链上第 j 阶系数为 binom(p + s_j, j) (见 _ratio_offsets), 链与基点无关
+    # 返回 (a, c): a[基点, 链, 阶] 为该阶差分的加权和, c[链, 阶] 为相邻两阶间的线性因子偏移
+    def _compile(self, plan, bases):
+        if not len(plan.rows): return np.zeros((len(bases), 1, 1) + self.Y.shape[1:]), np.zeros((1, 0))
+
+        # 多通道时差分与 a 末尾多一个通道轴
+        tail = self.Y.shape[1:]
+        orders, shifts, weights = plan.orders, plan.shifts, plan.weights
+        vals = weights.reshape(weights.shape + (1,) * len(tail)) * self.diff_table[bases[:, None] + plan.rows, orders]
+        used = np.flatnonzero(vals.reshape(len(bases), len(orders), -1).any(axis=(0, 2)))
+        degree = int(orders[used].max()) if len(used) else 0
+
+        keep = orders <= degree
+        orders, shifts, vals = orders[keep], shifts[keep], vals[:, keep]
+        chains = self._chains(orders, shifts, degree)
 
+        a = np.zeros((len(bases), len(chains), degree + 1) + tail, dtype=vals.dtype)
+        c = np.zeros((len(chains), degree))
+        for idx, chain in enumerate(chains):
+            on_chain = shifts == chain[orders]
+            if idx == 1: on_chain &= shifts != chains[0][orders]
+            np.add.at(np.moveaxis(a[:, idx], 1, 0), orders[on_chain], np.moveaxis(vals[:, on_chain], 1, 0))
+            c[idx] = self._ratio_offsets(degree + 1, chain)
+        return a, c
+
+    # 系数链: 各阶 (0..degree) 最小与最大的系数偏移, 两者相同时只有一条链
+    def _chains(self, orders, shifts, degree):
+        lo = np.full(degree + 1, np.iinfo(int).max)
+        hi = np.full(degree + 1, np.iinfo(int).min)
+        np.minimum.at(lo, orders, shifts)
+        np.maximum.at(hi, orders, shifts)
+        return [lo] if np.array_equal(lo, hi) else [lo, hi]
+
+    # 模板各项在位置 p 处的系数 weight * binom(p + shift, order), 每条系数链一次 binom_matrix
+    def plan_coefficients(self, plan, p):
+        if not len(plan.orders): return np.zeros(0)
+        degree = int(plan.orders.max())
+        coef = np.zeros(len(plan.orders))
+        for chain in self._chains(plan.orders, plan.shifts, degree):
+            on_chain = plan.shifts == chain[plan.orders]
+            coef[on_chain] = self.binom_matrix(p, degree + 1, chain)[plan.orders[on_chain]]
+        return plan.weights * coef
+
+    # 批量计算插值值 (method 为 None 时为全局多项式), xs 可为任意形状数组; 多通道时结果形状为 xs.shape + (通道数,)
+    # engine 缺省为 self.engine; 重心形式只用于未限制阶数的全局多项式 (限制阶数时为截断的牛顿形式, 仍按差分表求值)
+    def evaluate(self, method, xs, engine=None):
+        xs = np.asarray(xs, dtype=float)
+        if self.Y is None or self.n == 0: return np.zeros(xs.shape)
+        if method is None and self.global_engine(engine) == 'barycentric':
+            if self._bary is None: self._bary = BarycentricWeights(self.n)
+            return self._bary.evaluate((xs - self.node(0)) / self.h, self.Y)
+
+        tail = self.Y.shape[1:]
+        origin = self.node(0 if method is None else self.base_k)
+        p = ((xs - origin) / self.h).reshape(xs.shape + (1,) * len(tail))
+        a, c = self.compile_method(method)
+
+        # 嵌套乘法 (牛顿形式的霍纳法则), 各链同时计算; 链放在首轴, 使内层循环沿采样点连续进行
+        a = a.reshape(a.shape[:2] + (1,) * xs.ndim + tail)
+        c = c.reshape(c.shape + (1,) * p.ndim)
+        val = np.broadcast_to(a[:, -1], (len(a),) + xs.shape + tail)
+        for j in range(a.shape[1] - 2, -1, -1):
+            val = a[:, j] + (p + c[:, j]) / (j + 1) * val
+        return val.sum(axis=0)
+
+    # 方法在位置 p 处逐阶 (0..max_order) 的项由编译结果算出: 各链系数为比值的累积乘积, 同阶各链相加,
+    # 高于编译阶数的项为 0. 设置 tol 时分块计算 (首块 block 阶, 之后每块加倍), 累加到连续两项的绝对值
+    # 都不超过 tol 为止, 耗时与实际求和的阶数成正比. 返回 (值, 实际求和到的最高阶, 该阶项的绝对值), 最后一项的绝对值作为
+    # 截断误差的估计 (恰为 0 的项也计入, 如 p = 0 或低次多项式数据); 多通道时各通道同时停止, 值与估计为逐通道的数组
+    def sum_terms(self, method, p, block=8):
+        a, c = self.compile_method(method)
+        tail = a.shape[2:]
+        n = self.max_order + 1
+        step = n if self.tol is None else block
+        val, coef, small, stop, lo = 0, np.ones((len(a), 1)), False, n, 0
+        while lo < n:
+            hi = min(lo + step, n)
+            terms = np.zeros((hi - lo,) + tail, dtype=np.result_type(a.dtype, float))
+            top = min(hi, a.shape[1])
+            if lo < top:
+                # 第 lo..top-1 阶的系数, 接着上一块最后一阶的系数继续累乘
+                j = np.arange(max(lo, 1), top)
+                coefs = coef * np.cumprod((p + c[:, j - 1]) / j, axis=1)
+                if lo == 0: coefs = np.concatenate((coef, coefs), axis=1)
+                coef = coefs[:, -1:]
+                terms[:top - lo] = (a[:, lo:top] * coefs.reshape(coefs.shape + (1,) * len(tail))).sum(axis=0)
+            if self.tol is not None:
+                flags = np.concatenate(([small], (np.abs(terms).reshape(len(terms), -1) <= self.tol).all(axis=1)))
+                hit = np.flatnonzero(flags[1:] & flags[:-1])
+                if len(hit):
+                    stop = lo + int(hit[0]) + 1
+                    terms = terms[:stop - lo]
+                small = flags[-1]
+            val = val + terms.sum(axis=0)
+            if stop < n: break
+            lo, step = hi, step * 2
+        last = np.abs(terms[-1])
+        return val, stop - 1, float(last) if last.ndim == 0 else last
+
+    # 计算目标点处全部方法的值, 未失效的方法直接取缓存; 有共用缓存时相同数据, 基点, p 与容差的结果直接复用
     def calculate_all(self):
-        p, k, n = self.p, self.base_k, self.n
-        results = {}
-        
-        # 牛顿前插
-        val = sum(self.binom(p, j) * self.get_diff(k, j) for j in range(n) if k <= n-1-j)
-        results['Newton F'] = val
-        
-        # 牛顿后插
-        val = sum(self.binom(p + j - 1, j) * self.get_diff(k - j, j) for j in range(n) if k - j >= 0)
-        results['Newton B'] = val
-        
-        # 3. 高斯向前
-        val = 0
-        for j in range(n):
-            row = k - (j // 2)
-            m = j // 2
-            coef = self.binom(p + m - 1, j) if (j > 0 and j % 2 == 0) else self.binom(p + m, j)
-            val += coef * self.get_diff(row, j)
-        results['Gauss F'] = val
-        
-        # 4. 高斯向后
-        val = 0
-        for j in range(n):
-            row = k - ((j + 1) // 2)
-            m = j // 2
-            coef = self.binom(p + m, j)
-            val += coef * self.get_diff(row, j)
-        results['Gauss B'] = val
-        
-        # 5. 斯特林
-        results['Stirling'] = (results['Gauss F'] + results['Gauss B']) / 2
-        
-        # 6. 贝塞尔
-        val_bessel = 0
-        for m in range(n // 2 + 1):
-            j2 = 2 * m
-            if j2 < n:
-                coef = 1 if m == 0 else self.binom(p + m - 1, j2)
-                mean_diff = (self.get_diff(k-m, j2) + self.get_diff(k-m+1, j2))/2
-                val_bessel += coef * mean_diff
-            j3 = 2 * m + 1
-            if j3 < n:
-                coef = (1 if m == 0 else self.binom(p + m - 1, 2*m)) * (p-0.5)/(2*m+1)
-                val_bessel += coef * self.get_diff(k-m, j3)
-        results['Bessel'] = val_bessel
-        
-        return results
+        missing = [method for method in METHODS if method not in self._results]
+        key = None
+        if missing and self.cache is not None:
+            key = ("results", self.data_key(), self.dtype.str, self.base_k, float(self.p), self.tol)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._results.update(cached)
+                missing = []
+        for method in missing:
+            self._results[method] = self.sum_terms(method, self.p)
+        if key is not None and missing: self.cache.put(key, dict(self._results))
+        return {method: self._results[method][0] for method in METHODS}
+
+    # 多个目标点一次计算, 返回 (目标数, 6) 的矩阵 (多通道时为 (目标数, 6, 通道数)), 列顺序同 METHODS; 不改变当前目标点.
+    # 每个目标取最近节点为基点 (加载时指定了强制基点则都用它), 按基点分块收集差分后
+    # 在同一张差分表上以嵌套形式向量化求值; 求和到各方法的最高阶 (不按 tol 截断)
+    def calculate_all_many(self, targets):
+        if self.Y is None: raise ValueError("No data loaded")
+        t = np.asarray(targets, dtype=float).ravel()
+        ks = np.full(len(t), self._force_base) if self._force_base is not None else self._nearest_nodes(t)
+        tail = self.Y.shape[1:]
+        p = ((t - self.node(ks)) / self.h).reshape((len(t), 1) + (1,) * len(tail))
+        out = np.empty((len(t), len(METHODS)) + tail, dtype=np.result_type(self.dtype, float))
+
+        # 每块基点收集的差分不超过约 4M 个
+        order = np.argsort(ks, kind="stable")
+        ks_sorted = ks[order]
+        bases = np.unique(ks)
+        step = max(1, (1 << 22) // ((2 * self.n + 4) * int(np.prod(tail))))
+        for lo in range(0, len(bases), step):
+            block = bases[lo:lo + step]
+            i0, i1 = np.searchsorted(ks_sorted, [block[0], block[-1] + 1])
+            idx = order[i0:i1]
+            group, pb = np.searchsorted(block, ks[idx]), p[idx]
+            for col, method in enumerate(METHODS):
+                a, c = self._compile(method_plan(method, self.n, 0), block)
+                c = c.reshape(c.shape + (1,) * len(tail))
+                val = a[group, :, -1]
+                for j in range(a.shape[2] - 2, -1, -1):
+                    val = a[group, :, j] + (pb + c[:, j]) / (j + 1) * val
+                out[idx, col] = val.sum(axis=1)
+        return out
+
+    # 目标点处各方法实际求和到的最高阶 (未设置 tol 时为 max_order) 与截断误差估计: {方法: (阶, 最后一项的绝对值)}
+    def truncation_info(self):
+        self.calculate_all()
+        return {method: self._results[method][1:] for method in METHODS}
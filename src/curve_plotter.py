@@ -1,60 +1,178 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from .theme import Theme
+from .true_func import compile_true_func
+from .cache import cache
+from .perf import perf
 
 class CurvePlotter:
-    def __init__(self, master_window):
+    # engine 为全局多项式曲线的求值方式 (见 calculator.ENGINES), None 时沿用计算器的设置
+    def __init__(self, master_window, curve_cache=None, engine=None):
+        # 创建窗口时才导入 matplotlib, 保持核心模块无界面依赖
+        from matplotlib.figure import Figure
+
         self.master = master_window
-        self.fig, self.ax = plt.subplots(figsize=(5, 4), dpi=100)
+        self.fig = Figure(figsize=(5, 4), dpi=100)
+        self.ax = self.fig.add_subplot()
         self.fig.patch.set_facecolor(Theme.COLORS["paper"])
         self.ax.set_facecolor(Theme.COLORS["paper"])
         self.fig.subplots_adjust(left=0.12, right=0.95, top=0.92, bottom=0.12)
-        
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.master)
-        self.canvas.get_tk_widget().pack(fill="both", expand=True)
-        
+
+        # 无父窗口时使用 Agg 画布 (无界面渲染, 用于基准测试与导出)
+        if master_window is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.canvas = FigureCanvasAgg(self.fig)
+        else:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.canvas = FigureCanvasTkAgg(self.fig, master=self.master)
+            self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+        # 已计算的曲线: ("curve", 数据集, dtype, 求值方式, 基点, 方法, x 范围, 像素高度) -> (xs, ys), 缺省存入全局 LRU 缓存
+        self.curve_cache = cache if curve_cache is None else curve_cache
+        self.engine = engine
+        # 自适应采样参数: 初始点数, 点数上限, 允许的偏差 (像素)
+        self.start_points = 17
+        self.max_points = 400
+        self.pixel_tol = 0.5
+        self._true_key = None
+        self._true_xy = None
+        self._true_err = None
+        self.true_error = None
+        self._legend_key = None
+        self._data_key = None
+        self._build_artists()
+
+    # 创建常驻的图形对象, 之后每次绘制只更新数据
+    def _build_artists(self):
+        ax = self.ax
+        self.true_line, = ax.plot([], [], color="green", linewidth=2, alpha=0.6, label="True f(x)")
+        self.interp_line, = ax.plot([], [], color="red", linestyle="--", linewidth=1.5, label="Global Poly P(x)")
+        self.data_points = ax.scatter([], [], color="blue", s=30, zorder=5, label="Data")
+        self.true_line.set_visible(False)
+        perf.count("artists created", 3)
+
+        ax.set_title("Curve Comparison", fontsize=10, pad=5, fontname=Theme.FONT_FAMILY, weight="bold")
+        ax.tick_params(axis='both', which='major', labelsize=8)
+        ax.grid(True, linestyle='--', alpha=0.5)
+        self.legend = None
+
+    # 自适应采样: 从粗网格开始, 只细分中点偏离弦超过 pixel_tol 像素的区间, 总点数不超过 max_points.
+    # 各区间的中点值保留下来, 每轮只对上一轮细分产生的新区间求值; 纵向范围只增不减,
+    # 已收敛的区间不会重新超出容差, 由 active 掩码排除
+    def _sample(self, func, x_min, x_max, height_px):
+        xs = np.linspace(x_min, x_max, self.start_points)
+        ys = func(xs)
+        mid = y_mid = None
+        active = np.ones(len(xs) - 1, dtype=bool)
+        while len(xs) < self.max_points:
+            finite = ys[np.isfinite(ys)]
+            span = np.ptp(finite) if len(finite) else 0.0
+            if span == 0: break
+            if mid is None:
+                mid = (xs[:-1] + xs[1:]) / 2
+                y_mid = func(mid)
+            dev = np.abs(y_mid - (ys[:-1] + ys[1:]) / 2) * (height_px / span)
+            active &= dev > self.pixel_tol
+            refine = np.flatnonzero(active)
+            if len(refine) == 0: break
+            # 超出点数上限时只细分偏差最大的区间
+            budget = self.max_points - len(xs)
+            if len(refine) > budget:
+                refine = np.sort(refine[np.argsort(dev[refine])[::-1][:budget]])
+            left, m, right = xs[refine], mid[refine], xs[refine + 1]
+            xs = np.insert(xs, refine + 1, m)
+            ys = np.insert(ys, refine + 1, y_mid[refine])
+            if len(xs) >= self.max_points: break
+            # 区间 r 分成 (x_r, m_r) 与 (m_r, x_r+1), 两个新中点一次求值
+            new_mid = np.concatenate([(left + m) / 2, (m + right) / 2])
+            new_y = func(new_mid)
+            k = len(refine)
+            mid[refine], y_mid[refine] = new_mid[:k], new_y[:k]
+            mid = np.insert(mid, refine + 1, new_mid[k:])
+            y_mid = np.insert(y_mid, refine + 1, new_y[k:])
+            active = np.insert(active, refine + 1, True)
+        return xs, ys
+
+    # 取缓存曲线, 未命中时采样并存入
+    def _curve(self, calculator, data_key, method_name, x_min, x_max, height_px):
+        engine = None if method_name else calculator.global_engine(self.engine)
+        key = ("curve", data_key, calculator.dtype.str, engine, calculator.base_k if method_name else None, method_name, x_min, x_max, height_px)
+        curve = self.curve_cache.get(key)
+        if curve is not None: return curve
+        with perf.span("curve sample"):
+            curve = self._sample(lambda xs: calculator.evaluate(method_name, xs, engine), x_min, x_max, height_px)
+        for arr in curve: arr.setflags(write=False)
+        self.curve_cache.put(key, curve)
+        return curve
+
+    # 计算真实函数曲线, 表达式与 x 范围不变时复用上次结果; 表达式错误记录在 true_error 中
+    def _true_curve(self, true_func_str, x_min, x_max, height_px):
+        key = (true_func_str, x_min, x_max, height_px)
+        if key != self._true_key:
+            try:
+                self._true_xy, self._true_err = self._sample(compile_true_func(true_func_str), x_min, x_max, height_px), None
+            except Exception as e:
+                self._true_xy, self._true_err = None, str(e)
+            self._true_key = key
+        self.true_error = self._true_err
+        return self._true_xy
+
+    # 图例只在可见条目变化时重建; 切换方法时只更新插值曲线条目的颜色与文字 (图例框在绘制时按文字重新排版)
+    def _update_legend(self):
+        handles = [h for h in (self.true_line, self.interp_line) if h.get_visible()] + [self.data_points]
+        key = tuple(h.get_visible() for h in (self.true_line, self.interp_line))
+        if key != self._legend_key:
+            self._legend_key = key
+            self.legend = self.ax.legend(handles=handles, fontsize=8)
+            perf.count("artists created")
+            return
+        if not self.interp_line.get_visible(): return
+        i = handles.index(self.interp_line)
+        self.legend.legend_handles[i].set_color(self.interp_line.get_color())
+        self.legend.get_texts()[i].set_text(self.interp_line.get_label())
+
     def plot(self, calculator, true_func_str=None, method_name=None):
-        self.ax.clear()
-        
         # 1. 获取数据范围
         if calculator.X is None: return
 
         x_min, x_max = calculator.X[0], calculator.X[-1]
         padding = (x_max - x_min) * 0.1
-        x_range = np.linspace(x_min - padding, x_max + padding, 200)
-        
+        x_min, x_max = x_min - padding, x_max + padding
+        # 采样精度取决于坐标区的像素高度
+        height_px = max(int(self.ax.bbox.height), 1)
+
         # 2. 计算插值多项式 P(x)
+        data_key = calculator.data_key()
+        x_interp, y_interp = self._curve(calculator, data_key, method_name, x_min, x_max, height_px)
         if method_name:
-            y_interp = [calculator.calculate_method_value(method_name, x) for x in x_range]
             label_text = f"{method_name} P(x)"
             color = Theme.PATH_COLORS.get(method_name, "red")
         else:
-            y_interp = [calculator.get_interpolated_value(x) for x in x_range]
             label_text = "Global Poly P(x)"
             color = "red"
-        
-        # 3. 绘制真实函数 (如果提供)
+
+        # 3. 更新真实函数 (如果提供)
         if true_func_str:
-            try:
-                # 创建安全的求值环境
-                safe_dict = {"x": x_range, "np": np, "sin": np.sin, "cos": np.cos, "exp": np.exp, "log": np.log, "sqrt": np.sqrt, "pow": np.power}
-                y_true = eval(true_func_str, {"__builtins__": None}, safe_dict)
-                
-                self.ax.plot(x_range, y_true, color="green", linewidth=2, alpha=0.6, label="True f(x)")
-            except Exception as e:
-                print(f"Error plotting true function: {e}")
-
-        # 4. 绘制插值曲线
-        self.ax.plot(x_range, y_interp, color=color, linestyle="--", linewidth=1.5, label=label_text)
-        
-        # 5. 绘制原始数据点
-        self.ax.scatter(calculator.X, calculator.Y, color="blue", s=30, zorder=5, label="Data")
-        
-        # 设置图表样式
-        self.ax.set_title("Curve Comparison", fontsize=10, pad=5, fontname=Theme.FONT_FAMILY, weight="bold")
-        self.ax.tick_params(axis='both', which='major', labelsize=8)
-        self.ax.grid(True, linestyle='--', alpha=0.5)
-        self.ax.legend(fontsize=8)
-        
-        self.canvas.draw()
+            true_xy = self._true_curve(true_func_str, x_min, x_max, height_px)
+        else:
+            true_xy, self.true_error = None, None
+        if true_xy is not None:
+            self.true_line.set_data(*true_xy)
+        self.true_line.set_visible(true_xy is not None)
+
+        # 4. 更新插值曲线
+        self.interp_line.set_data(x_interp, y_interp)
+        self.interp_line.set_color(color)
+        self.interp_line.set_label(label_text)
+
+        # 5. 更新原始数据点 (数据集变化时)
+        if data_key != self._data_key:
+            self._data_key = data_key
+            self.data_points.set_offsets(np.column_stack([calculator.X, calculator.Y]))
+
+        # 按可见曲线与数据点重新确定坐标范围
+        self.ax.relim(visible_only=True)
+        self.ax.update_datalim(self.data_points.get_offsets())
+        self.ax.autoscale_view()
+        self._update_legend()
+
+        self.canvas.draw_idle()
@@ -0,0 +1,107 @@
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.colors import to_rgb
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.transforms import Affine2D
+
+# 差分表单元格 (方框 + 数值)
+# 一个艺术家对象在一次 draw 中画出全部单元格: 方框用一次 draw_markers 批量绘制,
+# 只格式化并绘制视野内的数值; 单元格在屏幕上过小时依次省略文字和方框 (细节层次),
+# 使重绘成本不随 n 增长
+class DiagramCells(Artist):
+    # 初始化
+    def __init__(self, ax, xs, ys, values, half_size, face, edge, text_color, family, size=9,
+                 weight="bold", box_min_px=4, label_min_px=42):
+        super().__init__()
+        self.axes = ax
+        self.set_figure(ax.figure)
+        self.set_transform(ax.transData)
+        self.set_in_layout(False)
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        self.values = np.asarray(values)
+        self.half_w, self.half_h = half_size
+        self.face = to_rgb(face)
+        self.edge = edge
+        self.text_color = text_color
+        self.box_min_px = box_min_px
+        self.label_min_px = label_min_px
+        self.prop = FontProperties(family=family, size=size, weight=weight)
+        self._extents = {}
+        # 最近一次完整绘制的方框像素尺寸与是否显示数值, 局部重绘时沿用
+        self._layout = None
+
+    # 单位数据长度对应的屏幕像素
+    def cell_pixels(self):
+        (x0, y0), (x1, y1) = self.axes.transData.transform([[0, 0], [1, 1]])
+        return abs(x1 - x0), abs(y1 - y0)
+
+    # 视野内的单元格下标; 给定 idx 时只在这些单元格中筛选
+    def _visible_cells(self, idx=None):
+        idx = np.arange(len(self.xs)) if idx is None else np.asarray(idx, dtype=int)
+        xs, ys = self.xs[idx], self.ys[idx]
+        (x_lo, x_hi), (y_lo, y_hi) = sorted(self.axes.get_xlim()), sorted(self.axes.get_ylim())
+        inside = ((xs >= x_lo - self.half_w) & (xs <= x_hi + self.half_w) &
+                  (ys >= y_lo - self.half_h) & (ys <= y_hi + self.half_h))
+        return idx[inside]
+
+    # 文字尺寸按长度缓存 (等宽字体)
+    def _extent(self, renderer, s):
+        key = len(s)
+        if key not in self._extents:
+            self._extents[key] = renderer.get_text_width_height_descent(s, self.prop, ismath=False)
+        return self._extents[key]
+
+    def draw(self, renderer):
+        self._layout = None
+        if not self.get_visible() or len(self.xs) == 0: return
+        px, py = self.cell_pixels()
+        if px < self.box_min_px: return
+        idx = self._visible_cells()
+        if len(idx) == 0: return
+
+        show_labels = px >= self.label_min_px
+        labels = [f"{val:.4f}" for val in self.values[idx]] if show_labels else []
+
+        # 方框: 以单元格中心为顶点, 一次画出同一个方形标记; 显示数值时方框不超过文字加边距
+        box_w, box_h = 2 * self.half_w * px, 2 * self.half_h * py
+        if labels:
+            w, h, _ = self._extent(renderer, max(labels, key=len))
+            em = renderer.points_to_pixels(self.prop.get_size_in_points())
+            box_w, box_h = min(box_w, w + 0.6 * em), min(box_h, h + em)
+        self._layout = (box_w, box_h, show_labels)
+        self._draw_cells(renderer, idx, labels, box_w, box_h)
+        self.stale = False
+
+    # 只重画给定下标的单元格 (用于高亮层 blit), 方框尺寸沿用最近一次完整绘制, 与背景中的单元格一致
+    def draw_subset(self, renderer, idx):
+        if self._layout is None or not self.get_visible(): return
+        box_w, box_h, show_labels = self._layout
+        idx = self._visible_cells(idx)
+        if len(idx) == 0: return
+        labels = [f"{val:.4f}" for val in self.values[idx]] if show_labels else []
+        self._draw_cells(renderer, idx, labels, box_w, box_h)
+
+    # 画出单元格 idx 的方框与数值
+    def _draw_cells(self, renderer, idx, labels, box_w, box_h):
+        gc = renderer.new_gc()
+        gc.set_clip_rectangle(self.axes.bbox)
+        gc.set_foreground(self.edge)
+        gc.set_linewidth(2)
+        marker = Affine2D().translate(-0.5, -0.5).scale(box_w, box_h)
+        centers = Path(np.column_stack([self.xs[idx], self.ys[idx]]))
+        renderer.draw_markers(gc, Path.unit_rectangle(), marker, centers, self.get_transform(), self.face)
+
+        # 数值: 居中绘制
+        if labels:
+            gc.set_foreground(self.text_color)
+            pts = self.get_transform().transform(centers.vertices)
+            _, canvas_h = renderer.get_canvas_width_height()
+            for (x, y), s in zip(pts, labels):
+                w, h, d = self._extent(renderer, s)
+                bx, by = x - w / 2, y - h / 2 + d
+                if renderer.flipy(): by = canvas_h - by
+                renderer.draw_text(gc, bx, by, s, self.prop, 0, ismath=False)
+
+        gc.restore()
@@ -0,0 +1,89 @@
+import numpy as np
+
+# 数值类型名 -> dtype (float32 省一半内存, longdouble 提高高阶差分的精度)
+DTYPES = {"float32": np.float32, "float64": np.float64, "longdouble": np.longdouble}
+
+
+# 差分表的紧凑存储: 第 j 阶差分只有 n - j 个有效值, 各阶依次连续存放在一维缓冲区中 (三角形按列打包);
+# 限制阶数时只存前 max_order + 1 阶, 即三角形左侧的一条带. 每阶预留 cap - j 个位置,
+# 首行偏移 row0 使删除首节点只需移动起点, 追加节点时按 1.5 倍扩容. 多通道数据的每个单元格为一行通道值
+class DiffTable:
+    # 初始化: n 行, cols 阶 (0..cols-1), tail 为单元格的形状 (单通道为 (), 多通道为 (通道数,))
+    def __init__(self, n, cols, dtype=np.float64, tail=()):
+        self.dtype = np.dtype(dtype)
+        self.tail = tuple(tail)
+        self.n = n
+        self.cols = cols
+        self._alloc(n, cols)
+
+    # 分配容量为 cap 行, cap_cols 阶的缓冲区; 第 j 阶从 offsets[j] 开始, 长 cap - j
+    def _alloc(self, cap, cap_cols):
+        self.cap = cap
+        self.cap_cols = cap_cols
+        self.row0 = 0
+        j = np.arange(cap_cols)
+        self.offsets = j * cap - j * (j - 1) // 2
+        self.buf = np.zeros((cap_cols * cap - cap_cols * (cap_cols - 1) // 2,) + self.tail, dtype=self.dtype)
+
+    @property
+    def shape(self):
+        return (self.n, self.cols)
+
+    @property
+    def nbytes(self):
+        return self.buf.nbytes
+
+    # 第 j 阶的 n - j 个有效值 (可写视图)
+    def column(self, j):
+        start = self.offsets[j] + self.row0
+        return self.buf[start:start + self.n - j]
+
+    # 保证能容纳 rows 行 cols 阶; 不足时扩容, 或只把数据移回缓冲区起点
+    def reserve(self, rows, cols):
+        if self.row0 + rows <= self.cap and cols <= self.cap_cols: return
+        cap = rows + rows // 2 + 1 if rows > self.cap else self.cap
+        cap_cols = min(cols + cols // 2 + 1, cap) if cols > self.cap_cols else self.cap_cols
+        old = [self.column(j) for j in range(self.cols)]
+        self._alloc(cap, cap_cols)
+        for j, col in enumerate(old): self.column(j)[:] = col
+
+    # 复制 (只复制有效部分)
+    def copy(self):
+        table = DiffTable(self.n, self.cols, self.dtype, self.tail)
+        for j in range(self.cols): table.column(j)[:] = self.column(j)
+        return table
+
+    # 有效单元格: 0 <= row <= n - 1 - order, 0 <= order < cols
+    def valid(self, rows, orders):
+        return (rows >= 0) & (orders >= 0) & (orders < self.cols) & (rows <= self.n - 1 - orders)
+
+    # 不检查越界的批量读取, 调用方保证 (rows, orders) 均为有效单元格
+    def take(self, rows, orders):
+        return self.buf[self.offsets[orders] + self.row0 + rows]
+
+    # table[rows, orders]: 与稠密表相同, 无效单元格为 0; rows, orders 为整数或可广播的整数数组
+    def __getitem__(self, key):
+        rows, orders = key
+        if np.ndim(rows) == 0 and np.ndim(orders) == 0:
+            if not self.valid(rows, orders): return np.zeros(self.tail, dtype=self.dtype)[()]
+            return self.buf[self.offsets[orders] + self.row0 + rows]
+        rows, orders = np.broadcast_arrays(np.asarray(rows, dtype=int), np.asarray(orders, dtype=int))
+        ok = self.valid(rows, orders)
+        out = np.zeros(rows.shape + self.tail, dtype=self.dtype)
+        out[ok] = self.take(rows[ok], orders[ok])
+        return out
+
+    # table[rows, orders] = values, 只能写有效单元格
+    def __setitem__(self, key, values):
+        rows, orders = key
+        self.buf[self.offsets[orders] + self.row0 + rows] = values
+
+    # 展开为 (n, cols) (多通道时为 (n, cols, 通道数)) 的稠密数组, 无效单元格为 0
+    def to_dense(self):
+        out = np.zeros((self.n, self.cols) + self.tail, dtype=self.dtype)
+        for j in range(self.cols): out[:self.n - j, j] = self.column(j)
+        return out
+
+    def __array__(self, dtype=None, copy=None):
+        dense = self.to_dense()
+        return dense if dtype is None else dense.astype(dtype)
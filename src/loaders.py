@@ -0,0 +1,82 @@
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+# 数据文件读取, 统一返回 (X, Y, x0, h); 文件中没有 X 时为均匀网格, X 为 None
+# .npy 与未压缩的 .npz 成员以只读内存映射打开, 不读入内存也不复制
+
+
+# CSV: 一列为 Y, 两列为 X, Y; 首行不是数值时视为表头
+def read_csv(path, delimiter=",", x0=None, h=None):
+    with open(path, encoding="utf-8") as f:
+        first = f.readline()
+    try:
+        [float(v) for v in first.split(delimiter) if v.strip()]
+        skip = 0
+    except ValueError:
+        skip = 1
+    data = np.loadtxt(path, delimiter=delimiter, skiprows=skip, ndmin=2)
+    return _columns(data, x0, h)
+
+
+# .npy: 一维为 Y; 二维为 (n, 2) 或 (2, n) 的 X, Y
+def read_npy(path, mmap=True, x0=None, h=None):
+    return _columns(np.load(path, mmap_mode="r" if mmap else None), x0, h)
+
+
+# .npz: 成员 Y (可为 (n, 通道数)), 以及 X 或标量 x0, h (缺省时用参数 x0, h)
+def read_npz(path, mmap=True, x0=None, h=None):
+    with np.load(path) as data, zipfile.ZipFile(path) as zf:
+        names = set(data.files)
+        if "Y" not in names: raise ValueError(f"{os.path.basename(path)}: missing array 'Y'")
+        Y = _member(path, zf, data, "Y", mmap)
+        if "X" in names: return _member(path, zf, data, "X", mmap), Y, None, None
+        x0 = float(data["x0"]) if "x0" in names else 0.0 if x0 is None else float(x0)
+        h = float(data["h"]) if "h" in names else 1.0 if h is None else float(h)
+    return None, Y, x0, h
+
+
+# 按扩展名读取
+def read_file(path, mmap=True, x0=None, h=None):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".csv", ".txt"): return read_csv(path, x0=x0, h=h)
+    if ext == ".npy": return read_npy(path, mmap, x0, h)
+    if ext == ".npz": return read_npz(path, mmap, x0, h)
+    raise ValueError(f"Unsupported data format: {ext}")
+
+
+# 把一维 / 两列数组拆成 (X, Y, x0, h); 均匀网格缺省 x0 = 0, h = 1
+def _columns(data, x0=None, h=None):
+    if data.ndim == 2 and data.shape[1] == 1: data = data[:, 0]
+    if data.ndim == 1:
+        return None, data, 0.0 if x0 is None else float(x0), 1.0 if h is None else float(h)
+    if data.ndim == 2 and data.shape[1] == 2: return data[:, 0], data[:, 1], None, None
+    if data.ndim == 2 and data.shape[0] == 2: return data[0], data[1], None, None
+    raise ValueError(f"Expected Y or two columns X, Y, got shape {data.shape}")
+
+
+# 读取 .npz 成员, 能映射时映射
+def _member(path, zf, data, name, mmap):
+    arr = _mmap_member(path, zf, name + ".npy") if mmap else None
+    return data[name] if arr is None else arr
+
+
+# 未压缩 (ZIP_STORED) 的 .npz 成员直接映射文件中的数据段; 压缩或对象数组返回 None
+def _mmap_member(path, zf, name):
+    info = zf.getinfo(name)
+    if info.compress_type != zipfile.ZIP_STORED: return None
+    with open(path, "rb") as f:
+        # 本地文件头 30 字节, 第 26/28 字节起为文件名与扩展字段长度
+        f.seek(info.header_offset)
+        name_len, extra_len = struct.unpack("<HH", f.read(30)[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if dtype.hasobject: return None
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape, order="F" if fortran else "C")
@@ -1,5 +1,3 @@
-import tkinter as tk
-
 # 日志处理
 class LogHandler:
     # 初始化
@@ -29,6 +27,29 @@ class LogHandler:
     def separator(self):
         self._write("-" * 30)
 
+    # 性能报告: 各阶段耗时 (按嵌套缩进) 与计数器
+    def perf_report(self, recorder):
+        self._write("[4] PERF", "title")
+        for name, ms, depth in recorder.summary():
+            self._write(f"• {'  ' * depth}{name:<{16 - 2 * depth}} {ms:8.2f} ms")
+        if recorder.counters:
+            self._write("• " + ", ".join(f"{k}: {v}" for k, v in recorder.counters.items()), "info")
+        self._write("F8: export trace · F9: profile next CRAFT", "info")
+
+    # 缓存报告: 各种类的命中/未命中 (本次会话累计), 条目数与占用内存
+    def cache_report(self, cache):
+        self._write("[5] CACHE", "title")
+        stats = cache.stats()
+        if stats:
+            self._write("• " + ", ".join(f"{kind} {hit}/{hit + miss}" for kind, (hit, miss) in stats.items()) + " hits")
+        self._write(f"• {len(cache)} entries, {cache.nbytes / 1e6:.2f} MB, {cache.evictions} evicted", "info")
+
+    # cProfile 热点: [(累计毫秒, 位置)]
+    def profile_report(self, rows):
+        self._write("cProfile (cumulative):", "accent")
+        for ms, where in rows:
+            self._write(f"  {ms:8.2f} ms  {where}")
+
     # 清空日志
     def clear(self):
         self.text_out.configure(state="normal")
@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+_NULL = nullcontext()
+
+
+# 性能记录: 计时区间 (可嵌套) 与计数器; 默认关闭, 关闭时 span 为空操作
+# 记录可导出为 JSON 汇总或 Chrome trace (chrome://tracing / Perfetto 可直接打开)
+class PerfRecorder:
+    # 初始化
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.reset()
+
+    # 开始新的一轮记录 (如一次 CRAFT); 上一轮中尚未结束的区间 (如已取消的后台计算) 不计入新一轮
+    def reset(self):
+        self.spans = []
+        self.counters = {}
+        self._round = getattr(self, "_round", 0) + 1
+        self._local = threading.local()
+
+    # 计时区间: with perf.span("diagram"): ...
+    def span(self, name):
+        return self._span(name) if self.enabled else _NULL
+
+    # 嵌套深度按线程分别记录, 后台线程的区间在 trace 中单独成行
+    @contextmanager
+    def _span(self, name):
+        local, round_ = self._local, self._round
+        depth = getattr(local, "depth", 0)
+        local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            local.depth = depth
+            if round_ == self._round:
+                self.spans.append((name, start - self.origin, time.perf_counter() - start, depth, threading.get_ident()))
+
+    # 计数器累加
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # 按开始时间排列的 (名称, 耗时毫秒, 嵌套深度)
+    def summary(self):
+        return [(name, dur * 1e3, depth) for name, _, dur, depth, _ in sorted(self.spans, key=lambda s: s[1])]
+
+    # JSON 汇总
+    def to_json(self):
+        return {
+            "spans": [{"name": name, "start_ms": start * 1e3, "ms": dur * 1e3, "depth": depth, "thread": tid}
+                      for name, start, dur, depth, tid in sorted(self.spans, key=lambda s: s[1])],
+            "counters": dict(self.counters),
+        }
+
+    # Chrome trace 事件格式: 区间为完整事件 (ph = X), 计数器为计数事件 (ph = C), 时间单位为微秒
+    def to_chrome_trace(self):
+        pid = os.getpid()
+        events = [{"name": name, "ph": "X", "ts": start * 1e6, "dur": dur * 1e6, "pid": pid, "tid": tid}
+                  for name, start, dur, _, tid in self.spans]
+        end = max((start + dur for _, start, dur, _, _ in self.spans), default=0.0)
+        events += [{"name": name, "ph": "C", "ts": end * 1e6, "pid": pid, "args": {name: value}}
+                   for name, value in self.counters.items()]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    # 写出 JSON 汇总与 Chrome trace 文件
+    def export(self, json_path, trace_path=None):
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2)
+        if trace_path:
+            with open(trace_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_chrome_trace(), f)
+
+    # 在 cProfile 下运行 fn, 统计写入 prof_path; 返回 fn 的返回值与累计耗时最多的 top 个函数 [(毫秒, 位置)]
+    def profile(self, fn, prof_path=None, top=8):
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(fn)
+        finally:
+            if prof_path: profiler.dump_stats(prof_path)
+        stats = pstats.Stats(profiler).stats
+        rows = sorted(((ct * 1e3, f"{os.path.basename(file)}:{line}({func})")
+                       for (file, line, func), (_, _, _, ct, _) in stats.items()), reverse=True)
+        return result, rows[:top]
+
+
+# 全局记录器, 由界面在启动时开启
+perf = PerfRecorder()
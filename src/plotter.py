@@ -1,6 +1,7 @@
-import matplotlib.pyplot as plt
+import numpy as np
 from .theme import Theme
-from .calculator import InterpolationCalculator
+from .calculator import InterpolationCalculator, METHODS
+from .perf import perf
 
 # 弗雷瑟图绘制器
 class FraserPlotter:
@@ -8,143 +9,127 @@ class FraserPlotter:
     def __init__(self, ax, canvas):
         self.ax = ax
         self.canvas = canvas
-        self.highlight_artists = []
+        # 路径高亮为一个复用的动画线集合, 切换方法时只替换数据并局部重绘 (blit)
+        self.path_lines = None
+        self.background = None
+        self.cells = None
+        # 高亮路径经过的单元格下标 (blit 时只重画这些单元格)
+        self.path_cells = np.empty(0, dtype=int)
+        # 单元格宽度小于该像素时不画数值 / 方框
+        self.label_min_px = 42
+        self.box_min_px = 4
+        canvas.mpl_connect("draw_event", self._on_draw)
 
     # 清除图形
     def clear(self):
         self.ax.clear()
-        self.clear_highlights()
+        self.path_lines = None
+        self.background = None
+        self.cells = None
+        self.path_cells = np.empty(0, dtype=int)
+        self.canvas.draw_idle()
+
+    # 完整重绘后缓存静态背景, 并把当前高亮叠加回去
+    def _on_draw(self, event):
+        if self.path_lines is None: return
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_path()
+
+    # 画出路径, 再把路径经过的单元格 (方框与数值) 重画在路径上方, 与静态绘制时的层次 (单元格 zorder 20 > 路径 10) 一致;
+    # 其余单元格不与路径重叠, 保留在背景位图中
+    def _draw_path(self):
+        self.ax.draw_artist(self.path_lines)
+        if self.cells is not None and len(self.path_cells):
+            self.cells.draw_subset(self.canvas.get_renderer(), self.path_cells)
+
+    # 只重绘高亮层: 恢复背景位图, 画出路径与单元格, 再把坐标区域贴回画布
+    def _blit_path(self):
+        if self.path_lines is None: return
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_path()
+        self.canvas.blit(self.ax.bbox)
+        perf.count("blits")
+
+    # 只移动基线 (差分表不变时目标点改变), 并清除旧基点的高亮路径
+    def update_base(self, calc: InterpolationCalculator):
+        if self.path_lines is None: return
+        k = calc.base_k
+        self.base_line.set_ydata([-k, -k])
+        self.base_label.set_y(-k)
+        self.base_label.set_text(f"BASE {k}")
+        self.path_lines.set_segments([])
+        self.path_cells = np.empty(0, dtype=int)
+        self.canvas.draw_idle()
 
     # 清除高亮路径
     def clear_highlights(self):
-        for artist in self.highlight_artists:
-            artist.remove()
-        self.highlight_artists = []
-        self.canvas.draw()
-
-    # 绘制路径线段
-    def draw_line(self, r1, c1, r2, c2, color):
-        x1, y1 = c1, -(r1 + c1/2.0)
-        x2, y2 = c2, -(r2 + c2/2.0)
-        line, = self.ax.plot([x1, x2], [y1, y2], color=color, lw=5, alpha=0.8, zorder=10)
-        self.highlight_artists.append(line)
+        if self.path_lines is None: return
+        self.path_lines.set_segments([])
+        self.path_cells = np.empty(0, dtype=int)
+        self._blit_path()
 
-    # 绘制弗雷瑟图
+    # 绘制弗雷瑟图: 连线为一个线集合, 方框与数值由一个单元格对象批量绘制
     def plot_diagram(self, calc: InterpolationCalculator):
+        from matplotlib.collections import LineCollection
+        from .diagram_cells import DiagramCells
+
         self.clear()
         ax = self.ax
         n = calc.n
+        cols = calc.max_order + 1
         
         ax.set_title("FRASER DIAGRAM", fontsize=16, color=Theme.COLORS["border"], pad=15, fontname=Theme.FONT_FAMILY, weight="bold")
         ax.set_axis_off()
         font_size = 9
-        
-        for j in range(n):
-            for i in range(n - j):
-                val = calc.diff_table[i][j]
-                x_pos = j
-                y_pos = -(i + j/2.0)
-                if j > 0:
-                    prev_y_u, prev_y_l = -(i + (j-1)/2.0), -((i+1) + (j-1)/2.0)
-                    ax.plot([j-1, j], [prev_y_u, y_pos], color=Theme.COLORS["border"], lw=2, ls='-', zorder=1) 
-                    ax.plot([j-1, j], [prev_y_l, y_pos], color=Theme.COLORS["border"], lw=2, ls='-', zorder=1)
-                ax.text(x_pos, y_pos, f"{val:.4f}", ha='center', va='center', color=Theme.COLORS["text_dark"],
-                        bbox=dict(boxstyle="square,pad=0.3", fc=Theme.COLORS["paper"], ec=Theme.COLORS["border"], lw=2),
-                        fontsize=font_size, fontname=Theme.FONT_FAMILY, weight="bold", zorder=20) 
 
-        ax.axhline(y=-calc.base_k, color=Theme.COLORS["accent"], linestyle='--', linewidth=3, zorder=5)
-        ax.text(n-0.5, -calc.base_k, f"BASE {calc.base_k}", color=Theme.COLORS["accent"], fontsize=font_size, va='center', fontname=Theme.FONT_FAMILY, weight="bold")
+        # 连线: 同一行 (i, 0..) 与同一反对角线 (i + j = d) 上的单元格各自共线, 每条只需一段
+        rows = np.arange(n)
+        row_end = np.minimum(n - 1 - rows, cols - 1)
+        diag_end = np.minimum(rows, cols - 1)
+        starts = np.concatenate([np.column_stack([np.zeros(n), -rows]), np.column_stack([np.zeros(n), -rows])])
+        ends = np.concatenate([np.column_stack([row_end, -(rows + row_end / 2.0)]),
+                               np.column_stack([diag_end, -(rows - diag_end / 2.0)])])
+        keep = ends[:, 0] > 0
+        edges = LineCollection(np.stack([starts[keep], ends[keep]], axis=1), colors=Theme.COLORS["border"],
+                               linewidths=2, linestyles='-', zorder=1)
+        ax.add_collection(edges)
+
+        # 单元格 (行 i, 阶 j): x = j, y = -(i + j/2)
+        j = np.repeat(np.arange(cols), n - np.arange(cols))
+        i = np.arange(len(j)) - np.repeat(np.cumsum(np.r_[0, n - np.arange(cols - 1)]), n - np.arange(cols))
+        xs, ys = j.astype(float), -(i + j / 2.0)
+        half = (0.4, 0.25)
+        cells = DiagramCells(ax, xs, ys, calc.diff_table[i, j], half, Theme.COLORS["paper"], Theme.COLORS["border"],
+                             Theme.COLORS["text_dark"], Theme.FONT_FAMILY, size=font_size,
+                             box_min_px=self.box_min_px, label_min_px=self.label_min_px)
+        cells.set_zorder(20)
+        ax.add_artist(cells)
+        self.cells = cells
+        ax.update_datalim([(-half[0], half[1]), (cols - 1 + half[0], -(n - 1) - half[1])])
+        ax.autoscale_view()
+
+        self.base_line = ax.axhline(y=-calc.base_k, color=Theme.COLORS["accent"], linestyle='--', linewidth=3, zorder=5)
+        self.base_label = ax.text(cols-0.5, -calc.base_k, f"BASE {calc.base_k}", color=Theme.COLORS["accent"], fontsize=font_size, va='center', fontname=Theme.FONT_FAMILY, weight="bold")
+        self.path_lines = LineCollection([], linewidths=5, alpha=0.8, zorder=10, animated=True)
+        ax.add_collection(self.path_lines, autolim=False)
+        perf.count("artists created", len(ax.collections) + len(ax.lines) + len(ax.texts) + len(ax.artists))
         self.canvas.figure.tight_layout()
         self.canvas.draw()
 
-    # 高亮显示插值路径
+    # 高亮显示插值路径: 路径段取自方法模板 (与计算器收集差分所用的模板相同), 单元格 (行 r, 阶 j) 位于 (j, -(r + j/2))
     def highlight_path(self, method, calc: InterpolationCalculator):
-        self.clear_highlights()
-        k = calc.base_k
-        n = calc.n
-        color = Theme.PATH_COLORS.get(method, "red")
-        
-        # 1. 牛顿前插
-        if method == "Newton F":
-            for j in range(1, n):
-                if k > n - 1 - j: break
-                self.draw_line(k, j-1, k, j, color)
-
-        # 2. 牛顿后插
-        elif method == "Newton B":
-            for j in range(1, n):
-                r_prev = k - (j-1)
-                r_curr = k - j
-                if r_curr < 0: break
-                self.draw_line(r_prev, j-1, r_curr, j, color)
+        if self.path_lines is None: return
+        # 路径只画到该方法在目标点实际用到的最高阶 (设置 tol 时可能提前终止)
+        order = calc.truncation_info()[method][0] if method in METHODS else 0
+        r1, c1, r2, c2 = calc.plan(method).path_upto(order).T
+        segments = np.stack([c1, -(r1 + c1 / 2.0), c2, -(r2 + c2 / 2.0)], axis=1).reshape(-1, 2, 2)
+        # 单元格按阶逐列排列, 第 j 列之前共有 j*n - j(j-1)/2 个单元格
+        r, c = np.concatenate([r1, r2]).astype(int), np.concatenate([c1, c2]).astype(int)
+        self.path_cells = np.unique(c * calc.n - c * (c - 1) // 2 + r)
 
-        # 3. 高斯向前
-        elif method == "Gauss F":
-            curr_r = k
-            for j in range(1, n):
-                next_r = curr_r
-                if j % 2 == 0: next_r = curr_r - 1
-                if next_r < 0 or next_r > n - 1 - j: break
-                self.draw_line(curr_r, j-1, next_r, j, color)
-                curr_r = next_r
-
-        # 4. 高斯向后
-        elif method == "Gauss B":
-            curr_r = k
-            for j in range(1, n):
-                next_r = curr_r
-                if j % 2 != 0: next_r = curr_r - 1
-                if next_r < 0 or next_r > n - 1 - j: break
-                self.draw_line(curr_r, j-1, next_r, j, color)
-                curr_r = next_r
-
-        # 5. 斯特林
-        elif method == "Stirling":
-            curr_r = k
-            for j in range(1, n):
-                next_r = curr_r
-                if j % 2 == 0: next_r = curr_r - 1
-                if next_r < 0 or next_r > n - 1 - j: break
-                self.draw_line(curr_r, j-1, next_r, j, color)
-                curr_r = next_r
-            
-            curr_r = k
-            for j in range(1, n):
-                next_r = curr_r
-                if j % 2 != 0: next_r = curr_r - 1
-                if next_r < 0 or next_r > n - 1 - j: break
-                self.draw_line(curr_r, j-1, next_r, j, color)
-                curr_r = next_r
-
-        # 6. 贝塞尔
-        elif method == "Bessel":
-            for j in range(1, n):
-                m = j // 2
-                if j % 2 == 1: 
-                    # 奇数列 j: 目标是 (k-m, j)
-                    r_target = k - m
-                    if r_target < 0 or r_target > n - 1 - j: continue
-                    
-                    # 来源自 j-1: (k-m, j-1) 和 (k-m+1, j-1)
-                    r_src1 = k - m
-                    r_src2 = k - m + 1
-                    
-                    if 0 <= r_src1 <= n - 1 - (j-1):
-                        self.draw_line(r_src1, j-1, r_target, j, color)
-                    if 0 <= r_src2 <= n - 1 - (j-1):
-                        self.draw_line(r_src2, j-1, r_target, j, color)
-                else:
-                    # 偶数列 j: 目标是 (k-m, j) 和 (k-m+1, j)
-                    # 来源自 j-1: (k-m+1, j-1)
-                    r_src = k - m + 1
-                    if r_src < 0 or r_src > n - 1 - (j-1): continue
-                        
-                    r_target1 = k - m
-                    if 0 <= r_target1 <= n - 1 - j:
-                        self.draw_line(r_src, j-1, r_target1, j, color)
-                    
-                    r_target2 = k - m + 1
-                    if 0 <= r_target2 <= n - 1 - j:
-                        self.draw_line(r_src, j-1, r_target2, j, color)
-
-        self.canvas.draw()
+        self.path_lines.set_segments(segments)
+        self.path_lines.set_color(Theme.PATH_COLORS.get(method, "red"))
+        self._blit_path()
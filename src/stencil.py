@@ -0,0 +1,104 @@
+from functools import lru_cache
+import numpy as np
+
+# 方法模板注册表: 方法名 -> builder(n, k), 返回该方法在 n 个节点, 基点 k 上读取的差分项
+# (行, 阶, 系数偏移, 权重) 四个数组, 系数为 binom(p + 偏移, 阶); 全局多项式的名称为 None
+STENCILS = {}
+
+
+def register_stencil(method):
+    def wrap(builder):
+        STENCILS[method] = builder
+        return builder
+    return wrap
+
+
+# 方法模板: 计算器按 (rows, orders) 收集差分并按 shifts 计算系数, 弗雷瑟图按 path 画出路径;
+# 数组均只读, 由 method_plan 按 (方法, n, k) 缓存
+class StencilPlan:
+    # 初始化: 各项的行, 阶, 系数偏移 (整数数组) 与权重; path 为 (段数, 4) 的整数数组 (行1, 阶1, 行2, 阶2)
+    def __init__(self, rows, orders, shifts, weights, path):
+        self.rows, self.orders, self.shifts, self.weights, self.path = rows, orders, shifts, weights, path
+        for arr in (rows, orders, shifts, weights, path): arr.setflags(write=False)
+
+    # 阶数不超过 max_order 的路径段
+    def path_upto(self, max_order):
+        return self.path[self.path[:, 3] <= max_order]
+
+
+# 取 (方法, n, k) 的模板, 未注册的方法为空模板
+@lru_cache(maxsize=512)
+def method_plan(method, n, k):
+    builder = STENCILS.get(method)
+    if builder is None:
+        empty = np.zeros(0, dtype=np.int32)
+        return StencilPlan(empty, empty.copy(), empty.copy(), np.zeros(0), np.zeros((0, 4), dtype=np.int32))
+    rows, orders, shifts, weights = builder(n, k)
+    rows, orders, shifts = (np.asarray(a, dtype=np.int32) for a in (rows, orders, shifts))
+    weights = np.broadcast_to(np.asarray(weights, dtype=float), rows.shape).copy()
+    return StencilPlan(rows, orders, shifts, weights, _path(rows, orders, n))
+
+
+# 路径: 方法读取的有效单元格中, 相邻两阶里在菱形图上相邻的单元格 (行 r 阶 j 与行 r 或 r + 1 阶 j - 1) 相连
+def _path(rows, orders, n):
+    valid = (rows >= 0) & (rows <= n - 1 - orders)
+    cells = np.unique(orders[valid].astype(np.int64) * (n + 1) + rows[valid])
+    order, row = np.divmod(cells, n + 1)
+    segments = []
+    for dr in (0, 1):
+        src = (order - 1) * (n + 1) + row + dr
+        hit = (order > 0) & np.isin(src, cells)
+        segments.append(np.stack([row[hit] + dr, order[hit] - 1, row[hit], order[hit]], axis=1))
+    return np.concatenate(segments).astype(np.int32)
+
+
+@register_stencil(None)
+def _global(n, k):
+    # 全局多项式: 以 X[0] 为基点的牛顿前插 (与 k 无关)
+    j = np.arange(n)
+    return np.zeros(n), j, np.zeros(n), 1.0
+
+
+@register_stencil('Newton F')
+def _newton_forward(n, k):
+    j = np.arange(n)
+    return np.full(n, k), j, np.zeros(n), 1.0
+
+
+@register_stencil('Newton B')
+def _newton_backward(n, k):
+    # binom(p + j - 1, j)
+    j = np.arange(n)
+    return k - j, j, j - 1, 1.0
+
+
+@register_stencil('Gauss F')
+def _gauss_forward(n, k):
+    # 偶数项 binom(p + m - 1, j), 奇数项 binom(p + m, j)
+    j = np.arange(n)
+    return k - j // 2, j, np.where((j > 0) & (j % 2 == 0), j // 2 - 1, j // 2), 1.0
+
+
+@register_stencil('Gauss B')
+def _gauss_backward(n, k):
+    # binom(p + m, j)
+    j = np.arange(n)
+    return k - (j + 1) // 2, j, j // 2, 1.0
+
+
+@register_stencil('Stirling')
+def _stirling(n, k):
+    # 高斯向前与向后的平均
+    parts = [_gauss_forward(n, k)[:3], _gauss_backward(n, k)[:3]]
+    return tuple(np.concatenate(cols) for cols in zip(*parts)) + (0.5,)
+
+
+@register_stencil('Bessel')
+def _bessel(n, k):
+    # 偶数阶取 (k-m, 2m) 与 (k-m+1, 2m) 的平均, 系数 binom(p+m-1, 2m);
+    # 奇数阶系数 binom(p+m-1, 2m)*(p-0.5)/(2m+1) 拆成 binom(p+m-1, 2m+1) 与 binom(p+m, 2m+1) 的平均
+    m = np.arange(n // 2 + 1)
+    rows = np.concatenate([k - m, k - m + 1, k - m, k - m])
+    orders = np.concatenate([2 * m, 2 * m, 2 * m + 1, 2 * m + 1])
+    shifts = np.concatenate([m - 1, m - 1, m - 1, m])
+    return rows, orders, shifts, 0.5
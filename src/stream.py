@@ -0,0 +1,77 @@
+import numpy as np
+from .calculator import InterpolationCalculator
+
+# 滑动窗口流式插值
+# 对等距样本流维护 m 个节点的窗口, 每到一个新样本只追加/删除一条反对角线,
+# 并在窗口内给定的偏移处 (以 h 为单位, 相对窗口首节点) 输出插值结果
+class StreamInterpolator:
+    # 初始化
+    def __init__(self, window, offsets, x0=0.0, h=1.0, max_order=None):
+        if window < 2: raise ValueError("Window must hold at least 2 nodes")
+        self.window = int(window)
+        self.offsets = [float(t) for t in np.atleast_1d(offsets)]
+        for t in self.offsets:
+            if not 0 <= t <= self.window - 1:
+                raise ValueError(f"Offset {t} out of window (0-{self.window-1})")
+        self.x0 = float(x0)
+        self.h = float(h)
+        self.max_order = max_order
+        self.calculator = InterpolationCalculator()
+        self._pending = []
+        self._count = 0
+        self._stencils = None
+
+    # 根据目标在窗口中的位置选择方法与基点: 前段牛顿前插, 后段牛顿后插,
+    # 中段 |p| <= 0.25 用斯特林, 否则用贝塞尔
+    def choose(self, offset):
+        last = self.window - 1
+        k = int(np.floor(offset))
+        frac = offset - k
+        if offset < last / 4:
+            return 'Newton F', k
+        if offset > 3 * last / 4:
+            return 'Newton B', int(np.ceil(offset))
+        if frac <= 0.25:
+            return 'Stirling', k
+        if frac >= 0.75:
+            return 'Stirling', k + 1
+        return 'Bessel', k
+
+    # 窗口大小与基点固定, 每个目标读取的单元格和系数在整个流上不变, 只需计算一次
+    def _build_stencil(self, offset):
+        calc = self.calculator
+        method, k = self.choose(offset)
+        calc.set_target(calc.x0 + offset * self.h, k)
+        p = offset - k
+        plan = calc.plan(method)
+        keep = (plan.rows >= 0) & (plan.rows <= calc.n - 1 - plan.orders) & (plan.orders <= calc.max_order)
+        rows, orders = plan.rows[keep], plan.orders[keep]
+        coefs = calc.plan_coefficients(plan, p)[keep]
+        return method, rows, orders, coefs
+
+    # 输入一个样本, 返回当前窗口上各目标的 (x, 值, 方法); 窗口未满时返回空列表
+    def feed(self, y):
+        calc = self.calculator
+        self._count += 1
+        if calc.Y is None:
+            self._pending.append(float(y))
+            if len(self._pending) < self.window: return []
+            calc.load_uniform(self.x0, self.h, self._pending, self.x0, max_order=self.max_order)
+            self._pending = []
+            self._stencils = [self._build_stencil(offset) for offset in self.offsets]
+        else:
+            calc.append_node(y)
+            calc.pop_front()
+
+        # 窗口首节点按样本序号计算, 避免长序列上 X[-1] + h 的累积误差
+        start = self._count - self.window
+        results = []
+        for offset, (method, rows, orders, coefs) in zip(self.offsets, self._stencils):
+            x = self.x0 + (start + offset) * self.h
+            results.append((x, float(coefs @ calc.diff_table.take(rows, orders)), method))
+        return results
+
+    # 依次消费样本流, 逐个产出 (x, 值, 方法)
+    def run(self, samples):
+        for y in samples:
+            yield from self.feed(y)
@@ -1,5 +1,3 @@
-from tkinter import ttk
-
 # 主题和样式定义
 class Theme:
     FONT_FAMILY = "Courier New"
@@ -31,6 +29,7 @@ class Theme:
     # 应用样式方法
     @staticmethod
     def apply_styles():
+        from tkinter import ttk
         style = ttk.Style()
         style.theme_use('clam') 
 
@@ -53,3 +52,6 @@ class Theme:
         style.configure("Treeview.Heading", background=c["button"], foreground="white", font=base_font, relief="raised")
         style.map("Treeview.Heading", background=[('active', c["button"])])
         style.map("Treeview", background=[('selected', c["accent"])])
+        style.configure("Horizontal.TProgressbar", background=c["accent"], troughcolor=c["paper"], bordercolor=c["border"], lightcolor=c["accent"], darkcolor=c["button"])
+        style.configure("TCheckbutton", font=base_font, background=c["bg_panel"], foreground=c["border"], indicatorbackground=c["paper"])
+        style.map("TCheckbutton", background=[('active', c["bg_panel"])], indicatorbackground=[('selected', c["accent"])])
@@ -0,0 +1,73 @@
+import ast
+from functools import lru_cache
+import numpy as np
+from .calculator import METHODS
+
+# 真实函数表达式中允许使用的函数与常量 (也可写作 np.sin 等)
+FUNCTIONS = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "arcsin": np.arcsin, "arccos": np.arccos, "arctan": np.arctan,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "exp": np.exp, "log": np.log, "log10": np.log10, "log2": np.log2,
+    "sqrt": np.sqrt, "abs": np.abs, "pow": np.power,
+}
+CONSTANTS = {"pi": np.pi, "e": np.e}
+
+_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant, ast.Attribute,
+          ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.FloorDiv, ast.USub, ast.UAdd)
+
+
+# 真实函数 f(x): 表达式只解析、校验、编译一次, 之后在整个 NumPy 网格上求值
+class TrueFunction:
+    # 初始化
+    def __init__(self, source):
+        self.source = source
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid True Func: {e.msg}")
+        for node in ast.walk(tree):
+            self._check(node)
+        self._code = compile(tree, "<true func>", "eval")
+        self._namespace = {"__builtins__": {}, "np": np, **FUNCTIONS, **CONSTANTS}
+
+    # 白名单校验: 只允许数值常量、x、算术运算及白名单函数调用
+    def _check(self, node):
+        if not isinstance(node, _NODES):
+            raise ValueError(f"Invalid True Func: '{type(node).__name__}' is not allowed")
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise ValueError(f"Invalid True Func: constant {node.value!r} is not allowed")
+        if isinstance(node, ast.Name) and node.id != "x" and node.id != "np" and node.id not in FUNCTIONS and node.id not in CONSTANTS:
+            raise ValueError(f"Invalid True Func: unknown name '{node.id}'")
+        if isinstance(node, ast.Attribute):
+            if not (isinstance(node.value, ast.Name) and node.value.id == "np" and (node.attr in FUNCTIONS or node.attr in CONSTANTS)):
+                raise ValueError(f"Invalid True Func: unknown name '{ast.unparse(node)}'")
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id not in FUNCTIONS:
+            raise ValueError(f"Invalid True Func: '{node.func.id}' is not callable")
+        if isinstance(node, ast.Call) and node.keywords:
+            raise ValueError("Invalid True Func: keyword arguments are not allowed")
+
+    # 在数组 xs 上求值, 结果与 xs 同形; 定义域外的点为 nan
+    def __call__(self, xs):
+        xs = np.asarray(xs, dtype=float)
+        with np.errstate(all="ignore"):
+            y = eval(self._code, self._namespace, {"x": xs})
+        return np.broadcast_to(np.asarray(y, dtype=float), xs.shape)
+
+    # 各方法在网格 xs 上的误差 (最大绝对误差, 均方根误差) 一次向量化计算; 目标点处的误差取 calculate_all 的值
+    # (即账本中显示的值, 设置 tol 时为截断后的和)
+    def errors(self, calc, xs, methods=METHODS):
+        xs = np.asarray(xs, dtype=float).ravel()
+        abs_err = np.abs(np.stack([calc.evaluate(m, xs) for m in methods]) - self(xs))
+        max_abs = abs_err.max(axis=1)
+        rms = np.sqrt(np.mean(abs_err ** 2, axis=1))
+        values = calc.calculate_all()
+        f_target = float(self(calc.target_x))
+        return {m: {"max_abs": float(max_abs[i]), "rms": float(rms[i]), "target": float(values[m]) - f_target}
+                for i, m in enumerate(methods)}
+
+
+# 按源字符串缓存编译结果; 表达式非法时抛出 ValueError
+@lru_cache(maxsize=64)
+def compile_true_func(source):
+    return TrueFunction(source)
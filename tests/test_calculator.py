@@ -0,0 +1,195 @@
+import math
+import numpy as np
+import pytest
+
+from src.calculator import InterpolationCalculator, METHODS
+from src.stream import StreamInterpolator
+
+
+# 参照实现: 逐项求和的原始公式 (差分表逐元素构建, 阶乘形式的二项式系数, 越出差分表或高于 max_order 的项为 0)
+def _binom(x, k):
+    if k < 0: return 0
+    res = 1.0
+    for i in range(k): res = res * (x - i)
+    return res / math.factorial(k)
+
+
+def _baseline(Y, k, p, max_order=None):
+    n = len(Y)
+    top = n - 1 if max_order is None else min(max_order, n - 1)
+    table = np.zeros((n, n))
+    table[:, 0] = Y
+    for j in range(1, n):
+        for i in range(n - j):
+            table[i, j] = table[i + 1, j - 1] - table[i, j - 1]
+
+    def d(row, order):
+        if row < 0 or row > n - 1 - order or order > top: return 0.0
+        return table[row, order]
+
+    res = {'Newton F': sum(_binom(p, j) * d(k, j) for j in range(n)),
+           'Newton B': sum(_binom(p + j - 1, j) * d(k - j, j) for j in range(n))}
+    res['Gauss F'] = sum((_binom(p + j // 2 - 1, j) if j > 0 and j % 2 == 0 else _binom(p + j // 2, j)) * d(k - j // 2, j)
+                         for j in range(n))
+    res['Gauss B'] = sum(_binom(p + j // 2, j) * d(k - (j + 1) // 2, j) for j in range(n))
+    res['Stirling'] = (res['Gauss F'] + res['Gauss B']) / 2
+    bessel = 0.0
+    for m in range(n // 2 + 1):
+        coef = 1 if m == 0 else _binom(p + m - 1, 2 * m)
+        bessel += coef * (d(k - m, 2 * m) + d(k - m + 1, 2 * m)) / 2
+        bessel += coef * (p - 0.5) / (2 * m + 1) * d(k - m, 2 * m + 1)
+    res['Bessel'] = bessel
+    res[None] = sum(_binom(p + k, j) * d(0, j) for j in range(n))
+    return res
+
+
+def _nearest(X, t):
+    return int(np.argmin(np.abs(X - t)))
+
+
+# 目标点落在节点上 (p = 0): 高阶项恰为 0, 但求和到了最高阶, 路径与阶数应为完整的
+@pytest.mark.parametrize("tol", [None, 1e-12])
+def test_truncation_order_at_node(tol):
+    calc = InterpolationCalculator(tol=tol)
+    calc.load_data("0,1,2,3,4", "0,0.8415,0.9093,0.1411,-0.7568", "2")
+    info = calc.truncation_info()
+    values = calc.calculate_all()
+    for method in METHODS:
+        assert values[method] == pytest.approx(0.9093)
+        order, est = info[method]
+        if tol is None:
+            assert (order, est) == (4, 0.0)
+        else:
+            assert order >= 2 and est <= tol
+
+
+# 低次多项式数据: 高于 1 阶的差分为 0, 估计为最后一项 (0), 不是整个值
+def test_truncation_order_polynomial_data():
+    calc = InterpolationCalculator()
+    calc.load_arrays(np.arange(6.0), 2 * np.arange(6.0) + 1, 2.5)
+    assert calc.calculate_all()['Bessel'] == pytest.approx(6.0)
+    for method, (order, est) in calc.truncation_info().items():
+        assert order == 5
+        assert est == 0.0
+
+    calc.set_tol(1e-12)
+    for method, (order, est) in calc.truncation_info().items():
+        assert order <= 3
+        assert est <= 1e-12
+
+
+# 重心形式在节点上取回节点值: X = 0.01 i 时 (x - x0) / h 与整数差一个舍入误差, 两端权重极小
+@pytest.mark.parametrize("n, h", [(50, 0.1), (200, 0.01), (200, 0.003)])
+def test_barycentric_nodes(n, h):
+    X = np.arange(n) * h
+    calc = InterpolationCalculator(engine='barycentric')
+    calc.load_arrays(X, np.sin(X), X[n // 2])
+    assert np.abs(calc.evaluate(None, X) - np.sin(X)).max() < 1e-12
+
+
+# 最高阶必须是非负整数, 非整数不截断
+@pytest.mark.parametrize("max_order", ["abc", "2.5", 2.5, "-1"])
+def test_invalid_max_order(max_order):
+    calc = InterpolationCalculator()
+    with pytest.raises(ValueError, match="Invalid Max Order"):
+        calc.load_data("0,1,2,3", "0,1,4,9", "1.5", max_order=max_order)
+
+
+# 计算器各入口与参照实现一致: 不同节点数, 自动与强制基点, 以及设置 max_order 的情况
+@pytest.mark.parametrize("n", [2, 3, 6, 11])
+@pytest.mark.parametrize("base", [None, 0, "mid", "last"])
+@pytest.mark.parametrize("max_order", [None, 2])
+def test_methods_match_baseline(n, base, max_order):
+    X = 0.5 + 0.2 * np.arange(n)
+    Y = np.sin(3 * X) + X ** 2
+    k_forced = {None: None, 0: 0, "mid": n // 2, "last": n - 1}[base]
+    targets = X[0] + 0.2 * np.array([-0.7, 0.3, n / 2 - 0.35, n - 1.2, n - 0.6])
+    calc = InterpolationCalculator()
+    for t in targets:
+        calc.load_arrays(X, Y, t, k_forced, max_order)
+        k = _nearest(X, t) if k_forced is None else k_forced
+        ref = _baseline(Y, k, (t - X[k]) / 0.2, max_order)
+        values = calc.calculate_all()
+        for method in METHODS:
+            assert values[method] == pytest.approx(ref[method], rel=1e-9, abs=1e-9)
+            assert calc.evaluate(method, [t])[0] == pytest.approx(ref[method], rel=1e-9, abs=1e-9)
+        assert calc.evaluate(None, [t])[0] == pytest.approx(ref[None], rel=1e-9, abs=1e-9)
+        if max_order is None:
+            assert calc.evaluate(None, [t], 'barycentric')[0] == pytest.approx(ref[None], rel=1e-9, abs=1e-9)
+
+    many = calc.calculate_all_many(targets)
+    for row, t in zip(many, targets):
+        k = _nearest(X, t) if k_forced is None else k_forced
+        ref = _baseline(Y, k, (t - X[k]) / 0.2, max_order)
+        assert row == pytest.approx([ref[method] for method in METHODS], rel=1e-9, abs=1e-9)
+
+
+# 增量修改 (追加节点, 删除首节点, 修改单个值) 后与重新加载的结果一致
+def test_incremental_updates_match_reload():
+    X = 0.1 * np.arange(8)
+    Y = np.cos(X) + X
+    target = 0.43
+    calc = InterpolationCalculator()
+    calc.load_arrays(X, Y, target)
+    calc.calculate_all()
+
+    def check():
+        fresh = InterpolationCalculator()
+        fresh.load_arrays(calc.X, calc.Y.copy(), target)
+        assert calc.base_k == fresh.base_k
+        # 全部单元格 (行 i, 阶 j), i + j <= n - 1
+        orders, last = np.triu_indices(calc.n)
+        assert calc.diff_table.take(last - orders, orders) == pytest.approx(
+            fresh.diff_table.take(last - orders, orders), abs=1e-12)
+        expected = fresh.calculate_all()
+        for method, value in calc.calculate_all().items():
+            assert value == pytest.approx(expected[method], rel=1e-12, abs=1e-12)
+        xs = np.linspace(calc.X[0], calc.X[-1], 7)
+        for method in (None,) + METHODS:
+            assert calc.evaluate(method, xs) == pytest.approx(fresh.evaluate(method, xs), rel=1e-12, abs=1e-12)
+
+    calc.append_node(1.7)
+    check()
+    calc.pop_front()
+    check()
+    calc.update_value(3, -0.25)
+    check()
+    calc.update_value(0, 2.0)
+    check()
+
+
+# 多通道数据的每个通道与单独计算该通道的结果一致
+def test_multichannel_matches_single_channel():
+    X = 0.25 * np.arange(9)
+    Y = np.column_stack([np.sin(X), np.exp(-X), X ** 3])
+    targets = [0.1, 0.9, 1.93]
+    calc = InterpolationCalculator()
+    calc.load_arrays(X, Y, 1.1)
+    values = calc.calculate_all()
+    many = calc.calculate_all_many(targets)
+    curves = {method: calc.evaluate(method, targets) for method in (None,) + METHODS}
+    for ch in range(Y.shape[1]):
+        single = InterpolationCalculator()
+        single.load_arrays(X, Y[:, ch], 1.1)
+        expected = single.calculate_all()
+        for method in METHODS:
+            assert values[method][ch] == pytest.approx(expected[method], rel=1e-12, abs=1e-12)
+        assert many[:, :, ch] == pytest.approx(single.calculate_all_many(targets), rel=1e-12, abs=1e-12)
+        for method, curve in curves.items():
+            assert curve[:, ch] == pytest.approx(single.evaluate(method, targets), rel=1e-12, abs=1e-12)
+
+
+# 流式插值的每个输出与在当前窗口上直接计算 (相同方法与基点) 的结果一致
+def test_stream_matches_direct():
+    h, window, offsets = 0.1, 7, [0.4, 3.1, 3.5, 5.8]
+    samples = np.sin(h * np.arange(20)) + 0.3 * h * np.arange(20)
+    stream = StreamInterpolator(window, offsets, h=h)
+    out = list(stream.run(samples))
+    assert len(out) == len(offsets) * (len(samples) - window + 1)
+    for idx, (x, value, method) in enumerate(out):
+        start, i = divmod(idx, len(offsets))
+        assert method == stream.choose(offsets[i])[0]
+        direct = InterpolationCalculator()
+        Xw = h * np.arange(start, start + window)
+        direct.load_arrays(Xw, samples[start:start + window], x, stream.choose(offsets[i])[1])
+        assert value == pytest.approx(direct.calculate_all()[method], rel=1e-9, abs=1e-12)